@@ -0,0 +1,263 @@
+# Benchmark ขั้นตอนที่หน้า Steel/Brick ทำในแต่ละการตรวจ โดยใช้ไฟล์จริงใน Data/*_wav
+#
+#   python -m benchmarks.bench_pipeline                     # ทุกไฟล์ ทุกวัสดุ ผลลง benchmarks/results/<commit>.json
+#   python -m benchmarks.bench_pipeline --limit 20 --repeat 3 --material brick --method zoom
+#   python -m benchmarks.bench_pipeline --compare old.json new.json
+#   python -m benchmarks.bench_pipeline --excel-baseline     # ขั้น persist แบบเดิม (เขียน Excel ใหม่ทั้งไฟล์) ไว้เทียบ
+#
+# ขั้นตอนเหมือน methods.analyze_audio ของหน้าเว็บ: ถอดรหัส -> quality.gate -> วิเคราะห์ตามวิธีที่เลือก
+# (full = decimate ตามวัสดุ) แล้วบันทึกผลและสร้างกราฟ เวลาแยกตามวัสดุเพราะแต่ละวัสดุใช้เส้นทางต่างกัน
+import argparse
+import glob
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from inspection.engine import load_audio
+from inspection.methods import METHODS, analyze_samples
+from inspection.plotting import spectrum_chart
+from inspection.profiles import PROFILES, get_profile
+from inspection.quality import RejectedCapture, gate
+from inspection.store import ResultStore
+
+STAGES = ["read", "gate", "analyze", "persist", "plot"]
+PERCENTILES = [50, 90, 95, 99]
+
+
+# save_to_excel เดิมของหน้า Steel/Brick (อ่านทั้งไฟล์ ต่อแถว แล้วเขียนใหม่) ใช้เฉพาะ --excel-baseline
+def save_to_excel(path, freq, amp, result):
+    if os.path.exists(path):
+        df = pd.read_excel(path)
+    else:
+        df = pd.DataFrame(columns=["Timestamp", "Peak Frequency (Hz)", "Peak Amplitude", "Result"])
+    new_row = {
+        "Timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "Peak Frequency (Hz)": freq,
+        "Peak Amplitude": amp,
+        "Result": result,
+    }
+    df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
+    df.to_excel(path, index=False)
+
+
+# เหมือนกราฟ FFT ในหน้า Steel/Brick: spec ของ Vega-Lite ที่ st.vega_lite_chart แปลงเป็น JSON ส่งไป browser
+def render_plot(frequencies, magnitudes, peak_freq, profile):
+    return json.dumps(spectrum_chart(frequencies, magnitudes, peak_freq, profile))
+
+
+class WallClock:
+    def start(self):
+        return time.perf_counter()
+
+    def stop(self, t0):
+        return time.perf_counter() - t0
+
+
+# peak allocation ระหว่างขั้นนั้น (tracemalloc ช้า จึงวัดแยกจากรอบจับเวลา)
+class PeakMemory:
+    def start(self):
+        tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[0]
+
+    def stop(self, base):
+        return tracemalloc.get_traced_memory()[1] - base
+
+
+# ขั้น persist ที่หน้าเว็บทำจริง: ResultStore.append ลงฐานข้อมูลชั่วคราว (หรือ Excel แบบเดิมเพื่อเทียบ)
+def make_persist(tmp, material, history_rows, excel_baseline):
+    if excel_baseline:
+        workbook = os.path.join(tmp, "bench_results.xlsx")
+        if history_rows:
+            pd.DataFrame({
+                "Timestamp": ["2024-01-01 00:00:00"] * history_rows,
+                "Peak Frequency (Hz)": 8700.0,
+                "Peak Amplitude": 300.0,
+                "Result": "Good",
+            }).to_excel(workbook, index=False)
+        return lambda freq, amp, result: save_to_excel(workbook, freq, amp, result)
+
+    store = ResultStore(os.path.join(tmp, "bench_results.db"))
+    if history_rows:
+        store.append_many([(material, 8700.0, 300.0, "Good", "2024-01-01 00:00:00")] * history_rows)
+    return lambda freq, amp, result: store.append(material, freq, amp, result)
+
+
+def run_once(path, profile, method, persist, stages, probe=WallClock()):
+    values = {}
+
+    def measured(stage, fn, *args):
+        if stage not in stages:
+            return fn(*args) if stage not in ("persist", "plot") else None
+        token = probe.start()
+        out = fn(*args)
+        values[stage] = probe.stop(token)
+        return out
+
+    # อ่านแบบเดียวกับหน้าเว็บ: WAV เป็น view ของไฟล์ (mmap) ชนิดเดิม
+    y, sr = measured("read", load_audio, path)
+    try:
+        measured("gate", gate, y)
+    except RejectedCapture:
+        return values  # หน้าเว็บหยุดที่นี่ ไม่วิเคราะห์และไม่บันทึก
+    r = measured("analyze", analyze_samples, y, sr, profile, method)
+    measured("persist", persist, r.peak_freq, r.peak_amp, r.result)
+    measured("plot", render_plot, r.frequencies, r.magnitudes, r.peak_freq, profile)
+    return values
+
+
+def peak_memory(path, profile, method, persist, stages):
+    tracemalloc.start()
+    try:
+        return run_once(path, profile, method, persist, stages, PeakMemory())
+    finally:
+        tracemalloc.stop()
+
+
+def summarize(samples):
+    a = np.asarray(samples) * 1000.0
+    out = {f"p{p}": float(np.percentile(a, p)) for p in PERCENTILES}
+    out.update(mean=float(a.mean()), min=float(a.min()), max=float(a.max()), n=int(a.size))
+    return out
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(files, profile, method, repeat, stages, history_rows, excel_baseline=False):
+    with tempfile.TemporaryDirectory() as tmp:
+        persist = make_persist(tmp, profile.key, history_rows, excel_baseline)
+
+        # warm-up หนึ่งรอบ (import/cache ครั้งแรกไม่นับ)
+        run_once(files[0], profile, method, persist, stages)
+
+        samples = {s: [] for s in stages}
+        totals = []
+        t_start = time.perf_counter()
+        for _ in range(repeat):
+            for path in files:
+                times = run_once(path, profile, method, persist, stages)
+                for s, v in times.items():
+                    samples[s].append(v)
+                totals.append(sum(times.values()))
+        wall = time.perf_counter() - t_start
+
+        memory = peak_memory(files[0], profile, method, persist, stages)
+
+    n = len(totals)
+    return {
+        "stages": {s: dict(summarize(samples[s]), peak_mem_bytes=memory.get(s, 0)) for s in stages if samples[s]},
+        "end_to_end_ms": summarize(totals),
+        "throughput_files_per_s": n / wall,
+        "wall_s": wall,
+        "inspections": n,
+        "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    }
+
+
+def print_report(report, material, method):
+    print(f"{report['inspections']} inspections ({material}, method {method}), "
+          f"{report['throughput_files_per_s']:.1f} files/s, max RSS {report['max_rss_bytes'] / 2**20:.0f} MiB")
+    cols = [f"p{p}" for p in PERCENTILES] + ["mean"]
+    print(f"{'stage (ms)':<12}" + "".join(f"{c:>9}" for c in cols) + f"{'peak mem':>12}")
+    for stage, st_ in report["stages"].items():
+        print(f"{stage:<12}" + "".join(f"{st_[c]:>9.2f}" for c in cols) + f"{st_['peak_mem_bytes'] / 2**20:>9.1f} MiB")
+    e2e = report["end_to_end_ms"]
+    print(f"{'total':<12}" + "".join(f"{e2e[c]:>9.2f}" for c in cols))
+
+
+# ผลต่อวัสดุ (ไฟล์ผลรุ่นเก่ามีวัสดุเดียวอยู่ที่ระดับบนสุด)
+def _materials(report):
+    return report.get("materials") or {report.get("material", "steel"): report}
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{old.get('commit')} -> {new.get('commit')}")
+    before = _materials(old)
+    for material, after in _materials(new).items():
+        if material not in before:
+            continue
+        print(f"{material + ' (p50 ms)':<16}{'old':>10}{'new':>10}{'ratio':>8}")
+        for stage in after["stages"]:
+            if stage not in before[material]["stages"]:
+                continue
+            a, b = before[material]["stages"][stage]["p50"], after["stages"][stage]["p50"]
+            print(f"{stage:<16}{a:>10.2f}{b:>10.2f}{b / a if a else float('nan'):>8.2f}")
+        a, b = before[material]["throughput_files_per_s"], after["throughput_files_per_s"]
+        print(f"{'files/s':<16}{a:>10.1f}{b:>10.1f}{b / a if a else float('nan'):>8.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_pipeline", description="Time each inspection stage over the bundled recordings.")
+    parser.add_argument("--data", default="Data/*_wav/*.wav", help="glob of recordings to use as fixtures")
+    parser.add_argument("--material", choices=sorted(PROFILES), action="append", help="profile to time (repeatable, default: all)")
+    parser.add_argument("--method", choices=METHODS, default="full", help="analysis method chosen on the page")
+    parser.add_argument("--limit", type=int, default=None, help="use only the first N files")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"comma separated subset of {','.join(STAGES)}")
+    parser.add_argument("--history-rows", type=int, default=0, help="pre-fill the results database (or workbook) with N rows")
+    parser.add_argument("--excel-baseline", action="store_true", help="time the old rewrite-the-workbook persist instead of ResultStore.append")
+    parser.add_argument("--out", default=None, help="JSON output (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    files = sorted(glob.glob(args.data))[: args.limit]
+    if not files:
+        print(f"no recordings match {args.data}", file=sys.stderr)
+        return 1
+    stages = [s for s in args.stages.split(",") if s]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "method": args.method,
+        "files": len(files),
+        "repeat": args.repeat,
+        "history_rows": args.history_rows,
+        "persist": "excel" if args.excel_baseline else "sqlite",
+    }
+    report["materials"] = {}
+    for key in args.material or sorted(PROFILES):
+        report["materials"][key] = run(files, get_profile(key), args.method, args.repeat, stages, args.history_rows, args.excel_baseline)
+        print_report(report["materials"][key], key, args.method)
+        print()
+
+    out = args.out or os.path.join("benchmarks", "results", f"{commit}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"-> {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
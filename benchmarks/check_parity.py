@@ -0,0 +1,120 @@
+# ตรวจว่าทุกวิธีวิเคราะห์ให้ผลตัดสินและยอดเดียวกับ analyze() (FFT ทั้งไฟล์) บนเสียงเคาะสังเคราะห์
+# ของแต่ละวัสดุ: ยอดในแถบ, ดังเกิน, ยอดต่ำ/สูงกว่าแถบ (เช่น อิฐที่มียอด 3 kHz เด่น), เสียงฮัมความถี่ต่ำ
+#
+#   python -m benchmarks.check_parity                # ทุกวัสดุ ทุกวิธี ออกด้วยรหัส 1 เมื่อมีกรณีไม่ตรง
+#   python -m benchmarks.check_parity --material brick --verbose
+#
+# วิธีที่ตรวจ: หน้าเว็บ (decimate + อ่าน WAV จาก bytes และจากไฟล์), zoom, taps, streaming
+# ยอดของหน้าเว็บ (decimate / WAV) ต้องตรง bin เดียวกับ analyze() (ห่างไม่เกิน bin ที่หยาบกว่า)
+# zoom / taps / streaming ใช้ window และความละเอียดต่างกัน ยอดของเสียงที่ลดลงเร็วกว้างหลาย bin
+# จึงยอมให้ห่างได้อีก LINEWIDTH_TOLERANCE ของความกว้างยอด (FWHM = 1 / (pi * decay))
+import argparse
+import io
+import os
+import sys
+import tempfile
+
+import numpy as np
+import soundfile as sf
+
+from inspection.engine import analyze
+from inspection.methods import analyze_audio
+from inspection.profiles import PROFILES, get_profile
+from inspection.streaming import analyze_stream
+
+SAMPLE_RATE = 48000
+SECONDS = 2.5
+TAP_TIMES = (0.4, 1.1, 1.8)
+NOISE = 1e-3
+SHORT_DECAY = 0.02  # วินาที: เคาะสั้น แอมพลิจูดทั้งไฟล์ต่ำกว่าเกณฑ์
+LONG_DECAY = 0.3  # ก้องนาน ดังเกิน max_amplitude
+LINEWIDTH_TOLERANCE = 0.25
+METHODS = ["wav-bytes", "wav-file", "zoom", "taps", "stream"]
+EXACT_METHODS = {"wav-bytes", "wav-file"}
+
+
+# เสียงเคาะที่ TAP_TIMES: ผลรวมของไซน์ (ความถี่, ขนาด) ที่ลดลงแบบ exponential + เสียงฮัม/เสียงพื้น
+def tap_signal(tones, decay, hum=0.0, sr=SAMPLE_RATE, seed=0):
+    t = np.arange(int(SECONDS * sr)) / sr
+    y = NOISE * np.random.default_rng(seed).standard_normal(len(t)) + hum * np.sin(2 * np.pi * 50 * t)
+    for start in TAP_TIMES:
+        env = np.where(t >= start, np.exp(-(t - start) / decay), 0.0)
+        for freq, amp in tones:
+            y += env * amp * np.sin(2 * np.pi * freq * (t - start))
+    return y / np.max(np.abs(y)) * 0.9
+
+
+def cases(profile, sr=SAMPLE_RATE):
+    centre = (profile.freq_low + profile.freq_high) / 2
+    below = centre / 3
+    above = min(8 * profile.freq_high, 0.4 * sr)
+    # ชื่อกรณี -> (สัญญาณ, decay)
+    return {
+        "in-band": (tap_signal([(centre, 1.0)], SHORT_DECAY), SHORT_DECAY),
+        "in-band loud": (tap_signal([(centre, 1.0)], LONG_DECAY), LONG_DECAY),
+        "below band": (tap_signal([(below, 1.0), (centre, 0.3)], SHORT_DECAY), SHORT_DECAY),
+        "above band": (tap_signal([(above, 1.0), (centre, 0.3)], SHORT_DECAY), SHORT_DECAY),
+        "above band loud": (tap_signal([(above, 1.0), (centre, 0.3)], LONG_DECAY), LONG_DECAY),
+        "mains hum": (tap_signal([(centre, 1.0)], SHORT_DECAY, hum=0.01), SHORT_DECAY),
+    }
+
+
+def wav_bytes(y, sr):
+    buf = io.BytesIO()
+    sf.write(buf, np.column_stack([y, y]), sr, subtype="PCM_16", format="WAV")
+    return buf.getvalue()
+
+
+def run_method(method, data, path, profile):
+    if method == "wav-bytes":
+        return analyze_audio(data, len(data), profile)
+    if method == "wav-file":
+        return analyze_audio(path, len(data), profile)
+    if method == "stream":
+        return analyze_stream(io.BytesIO(data), profile)
+    return analyze_audio(data, len(data), profile, method)
+
+
+def bin_width(frequencies):
+    return float(frequencies[1] - frequencies[0]) if len(frequencies) > 1 else 0.0
+
+
+def check(profile, verbose=False, sr=SAMPLE_RATE):
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, (y, decay) in cases(profile, sr).items():
+            data = wav_bytes(y, sr)
+            path = os.path.join(tmp, "case.wav")
+            with open(path, "wb") as f:
+                f.write(data)
+            # ค่าอ้างอิงจากตัวอย่างที่ถอดรหัสแล้ว (เหมือนที่หน้าเว็บเดิมทำด้วย sf.read)
+            ref = analyze(sf.read(io.BytesIO(data))[0], sr, profile)
+            for method in METHODS:
+                r = run_method(method, data, path, profile)
+                tolerance = max(bin_width(ref.frequencies), bin_width(r.frequencies)) + 1e-9
+                if method not in EXACT_METHODS:
+                    tolerance += LINEWIDTH_TOLERANCE / (np.pi * decay)
+                ok = r.result == ref.result and abs(r.peak_freq - ref.peak_freq) <= tolerance
+                failures += not ok
+                if verbose or not ok:
+                    print(f"{'ok  ' if ok else 'FAIL'} {profile.key:6} {name:16} {method:10} "
+                          f"{r.result:18} {r.peak_freq:9.2f} Hz {r.peak_amp:9.1f}   "
+                          f"analyze(): {ref.result} {ref.peak_freq:.2f} Hz {ref.peak_amp:.1f}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.check_parity", description="Check every analysis method against analyze() on synthetic taps.")
+    parser.add_argument("--material", choices=sorted(PROFILES), action="append", help="profile to check (repeatable, default: all)")
+    parser.add_argument("--verbose", "-v", action="store_true", help="print every case, not only mismatches")
+    args = parser.parse_args(argv)
+
+    keys = args.material or sorted(PROFILES)
+    failures = sum(check(get_profile(key), args.verbose) for key in keys)
+    total = sum(len(cases(get_profile(key))) for key in keys) * len(METHODS)
+    print(f"{total - failures}/{total} cases match analyze()")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
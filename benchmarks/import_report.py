@@ -0,0 +1,89 @@
+# รายงานเวลา import ตอนเปิดแต่ละหน้า (ใช้ python -X importtime ใน process ใหม่)
+#
+#   python -m benchmarks.import_report                         # home.py + pages/*.py
+#   python -m benchmarks.import_report pages/2_Steel.py --top 15
+#   python -m benchmarks.import_report inspection.engine numpy  # โมดูลใดก็ได้
+#
+# streamlit ถูก import ไว้แล้วใน server จึงหักเวลาของ streamlit ออก (ยกเว้น --with-streamlit)
+import argparse
+import ast
+import glob
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+DEFAULT_TARGETS = ["home.py"] + sorted(glob.glob("pages/*.py"))
+
+
+# คำสั่ง import ระดับบนสุดของสคริปต์หน้าเว็บ (สิ่งที่รันก่อนแสดงผลครั้งแรก)
+def page_imports(path):
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def import_code(target):
+    if target.endswith(".py"):
+        return page_imports(target)
+    return f"import {target}"
+
+
+# แถวของ -X importtime: (self us, cumulative us, ชื่อโมดูล, ระดับความลึก)
+def parse_importtime(stderr):
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), name.strip(), depth))
+    return rows
+
+
+def measure(target, with_streamlit=False):
+    code = import_code(target)
+    if not with_streamlit:
+        code = "import streamlit\n" + code
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")]))},
+    )
+    if proc.returncode:
+        raise RuntimeError(f"{target}: {proc.stderr.strip().splitlines()[-1]}")
+    rows = parse_importtime(proc.stderr)
+    if not with_streamlit:
+        # ลูกถูกพิมพ์ก่อนแม่ แถว streamlit ระดับบนสุดจึงปิดท้ายทุกอย่างที่ streamlit ดึงมา
+        end = next(i for i, r in enumerate(rows) if r[2] == "streamlit" and r[3] == 0)
+        rows = rows[end + 1 :]
+    return rows
+
+
+def summarize(rows, top):
+    total = sum(r[1] for r in rows if r[3] == 0)
+    by_package = defaultdict(int)
+    for self_us, _, name, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+    packages = sorted(by_package.items(), key=lambda kv: -kv[1])[:top]
+    return total, packages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.import_report", description="Show where page start-up import time goes.")
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS, help="page scripts (*.py) or module names")
+    parser.add_argument("--top", type=int, default=10, help="packages to list per target")
+    parser.add_argument("--with-streamlit", action="store_true", help="include the cost of importing streamlit itself")
+    args = parser.parse_args(argv)
+
+    for target in args.targets:
+        total, packages = summarize(measure(target, args.with_streamlit), args.top)
+        print(f"{target}: {total / 1000:.1f} ms")
+        for name, self_us in packages:
+            print(f"  {name:<24}{self_us / 1000:>9.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
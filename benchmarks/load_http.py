@@ -0,0 +1,116 @@
+# Load test ของ HTTP service (inspection.server) ด้วยไฟล์จริงใน Data/*_wav
+#
+#   python -m benchmarks.load_http                                # เริ่ม service ในตัว (DB ชั่วคราว)
+#   python -m benchmarks.load_http --concurrency 16 --workers 2 --queue 4
+#   python -m benchmarks.load_http --url http://127.0.0.1:8502    # ยิงไปที่ service ที่รันอยู่แล้ว
+import argparse
+import glob
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+
+import numpy as np
+
+from inspection.cache import AnalysisCache
+from inspection.methods import METHODS
+from inspection.profiles import PROFILES
+from inspection.server import InspectionService, make_server
+from inspection.store import ResultStore
+
+
+def post(url, data, timeout=120):
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "audio/wav"}, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"{}")
+
+
+def run(base_url, files, material, method, total, concurrency):
+    payloads = [open(p, "rb").read() for p in files]
+    url = f"{base_url}/inspect/{material}?method={method}"
+    lock = threading.Lock()
+    counter = iter(range(total))
+    latencies, statuses = [], Counter()
+
+    def client():
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            t0 = time.perf_counter()
+            status, _ = post(url, payloads[i % len(payloads)])
+            elapsed = time.perf_counter() - t0
+            with lock:
+                statuses[status] += 1
+                if status == 200:
+                    latencies.append(elapsed)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - t0, np.array(latencies), statuses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load_http", description="Load-test the headless inspection service.")
+    parser.add_argument("--url", default=None, help="existing service (default: start one in-process on a temp database)")
+    parser.add_argument("--data", default="Data/*_wav/*.wav", help="glob of recordings to POST")
+    parser.add_argument("--material", choices=sorted(PROFILES), default="steel")
+    parser.add_argument("--method", choices=METHODS, default="full")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8, help="simultaneous clients")
+    parser.add_argument("--workers", type=int, default=2, help="in-process service: analysis workers")
+    parser.add_argument("--queue", type=int, default=8, help="in-process service: queue size before 503")
+    parser.add_argument("--processes", action="store_true", help="in-process service: use worker processes")
+    parser.add_argument("--cache", action="store_true", help="in-process service: keep the result cache (repeated files skip analysis)")
+    args = parser.parse_args(argv)
+
+    files = sorted(glob.glob(args.data))
+    if not files:
+        print(f"no recordings match {args.data}", file=sys.stderr)
+        return 1
+
+    server = service = None
+    base_url = args.url
+    if base_url is None:
+        db = os.path.join(tempfile.mkdtemp(prefix="load_http_"), "results.db")
+        cache = None if args.cache else AnalysisCache(max_bytes=0, directory=None)
+        service = InspectionService(ResultStore(db), args.workers, args.queue, args.processes, cache)
+        server = make_server(service, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+
+    try:
+        elapsed, latencies, statuses = run(base_url.rstrip("/"), files, args.material, args.method, args.requests, args.concurrency)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            service.shutdown()
+
+    ok = statuses.get(200, 0)
+    print(f"{args.requests} requests, {args.concurrency} clients, {len(files)} distinct files -> {base_url}")
+    print(f"status: {dict(sorted(statuses.items()))}")
+    print(f"throughput: {ok / elapsed:.1f} ok/s ({args.requests / elapsed:.1f} req/s) over {elapsed:.2f}s")
+    if ok:
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+        print(f"latency ms: p50 {p50:.1f}  p95 {p95:.1f}  p99 {p99:.1f}  max {latencies.max() * 1000:.1f}")
+    if service is not None:
+        print(f"service: {service.status()}, rows logged: {service.store.count(args.material)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
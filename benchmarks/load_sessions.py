@@ -0,0 +1,418 @@
+# Load test หน้า Steel/Brick ด้วยผู้ใช้จำลองหลาย session พร้อมกันบน Streamlit server ตัวเดียว
+#
+#   python -m benchmarks.load_sessions                               # 1, 2, 4, 8 session (เริ่ม server เอง, DB ชั่วคราว)
+#   python -m benchmarks.load_sessions --sessions 4,16 --uploads 5 --interval 2
+#   python -m benchmarks.load_sessions --url http://127.0.0.1:8501 --pid 1234 --db test_results.db
+#
+# แต่ละ session เป็น client websocket (/_stcore/stream) แบบเดียวกับ browser: เปิดหน้า เลือกโหมดอัปโหลด
+# แล้วอัปโหลดไฟล์จาก Data/ ทีละไฟล์ตามรอบเวลา (ผ่าน /_stcore/upload_file เหมือน browser จริง)
+# เวลาของ rerun = ส่งคำสั่ง rerun จนได้ script_finished ครั้งสุดท้าย (รวม st.rerun() ที่หน้าเรียกเอง)
+# AppTest ใช้ไม่ได้เพราะมี runtime ได้ตัวเดียวต่อ process จึงจำลองหลาย session พร้อมกันไม่ได้
+# CPU/RSS ของ server อ่านจาก /proc (Linux) แถวที่หายนับจากฐานข้อมูลเทียบกับไฟล์ใหม่ที่อัปโหลด
+import argparse
+import asyncio
+import glob
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+
+import numpy as np
+
+from inspection.cache import audio_digest
+from inspection.metrics import STAGES
+from inspection.store import ResultStore
+
+DEFAULT_PAGES = ["pages/2_Steel.py", "pages/3_Brick.py"]
+MATERIALS = {"pages/2_Steel.py": "steel", "pages/3_Brick.py": "brick"}
+RESULT_MARKER = "Peak Frequency"
+TIMEOUT = 120.0
+
+
+def page_name(path):
+    # pages/2_Steel.py -> "Steel" (เหมือน url ของหน้าใน Streamlit)
+    return re.sub(r"^\d*_?", "", os.path.splitext(os.path.basename(path))[0])
+
+
+def percentiles(values):
+    if not len(values):
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": p50, "p95": p95, "p99": p99, "max": float(np.max(values))}
+
+
+class ServerProbe:
+    # อ่าน CPU (utime + stime) และ RSS ของ process server เป็นระยะใน thread เบื้องหลัง
+    def __init__(self, pid, period=0.25):
+        self.pid = pid
+        self.period = period
+        self.tick = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+        self.rss_peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def cpu_seconds(self):
+        try:
+            with open(f"/proc/{self.pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            return (int(fields[11]) + int(fields[12])) / self.tick
+        except (OSError, IndexError, ValueError):
+            return None
+
+    def rss(self):
+        try:
+            with open(f"/proc/{self.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+        return None
+
+    def _run(self):
+        while not self._stop.wait(self.period):
+            self.rss_peak = max(self.rss_peak, self.rss() or 0)
+
+    def start(self):
+        self.rss_peak = self.rss() or 0
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+class Session:
+    def __init__(self, base_url, page):
+        from streamlit.proto.BackMsg_pb2 import BackMsg  # noqa: F401  (ตรวจว่ามี streamlit)
+
+        self.base_url = base_url
+        self.page = page
+        self.ws = None
+        self.session_id = None
+        self.page_hash = ""
+        self.widgets = {}  # label -> (proto ของ element, fragment_id)
+        self.states = {}  # widget id -> WidgetState
+        self.markdown = []
+        self.exceptions = []
+
+    async def connect(self):
+        from websockets.asyncio.client import connect
+
+        ws_url = self.base_url.replace("http", "ws", 1) + "/_stcore/stream"
+        self.ws = await connect(ws_url, subprotocols=["streamlit"], origin=self.base_url, max_size=None)
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    async def _send(self, msg):
+        await self.ws.send(msg.SerializeToString())
+
+    async def _receive(self):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = ForwardMsg()
+        msg.ParseFromString(await asyncio.wait_for(self.ws.recv(), TIMEOUT))
+        return msg
+
+    # rerun หนึ่งครั้ง (ทั้งหน้า หรือเฉพาะ fragment) รอจนรันเสร็จจริง คืนเวลาเป็นวินาที
+    async def rerun(self, fragment_id=""):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        back = BackMsg()
+        # ต้องส่ง hash ของหน้าเหมือน browser ไม่เช่นนั้น st.rerun() ของหน้าจะย้อนไปหน้าแรก
+        back.rerun_script.page_name = page_name(self.page)
+        back.rerun_script.page_script_hash = self.page_hash
+        back.rerun_script.fragment_id = fragment_id
+        back.rerun_script.widget_states.widgets.extend(self.states.values())
+        self.markdown, self.exceptions = [], []
+        t0 = time.perf_counter()
+        await self._send(back)
+        while True:
+            msg = await self._receive()
+            kind = msg.WhichOneof("type")
+            if kind == "new_session" and msg.new_session.initialize.session_id:
+                self.session_id = msg.new_session.initialize.session_id
+            elif kind == "navigation":
+                self.page_hash = msg.navigation.page_script_hash
+            elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                self._element(msg.delta.new_element, msg.delta.fragment_id)
+            elif kind == "page_not_found":
+                raise RuntimeError(f"page not found: {self.page}")
+            elif kind == "script_finished":
+                if msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    return time.perf_counter() - t0
+
+    def _element(self, element, fragment_id):
+        kind = element.WhichOneof("type")
+        if kind in ("radio", "file_uploader"):
+            proto = getattr(element, kind)
+            self.widgets[proto.label] = (proto, fragment_id)
+        elif kind == "markdown":
+            self.markdown.append(element.markdown.body)
+        elif kind == "exception":
+            self.exceptions.append(element.exception.message)
+
+    def widget(self, prefix):
+        for label, value in self.widgets.items():
+            if label.startswith(prefix):
+                return value
+        raise KeyError(f"no widget labelled {prefix!r} on {self.page}")
+
+    async def choose(self, prefix, index):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        proto, fragment_id = self.widget(prefix)
+        state = WidgetState(id=proto.id, string_value=proto.options[index])
+        self.states[proto.id] = state
+        return await self.rerun(fragment_id)
+
+    # อัปโหลดแบบเดียวกับ browser: ขอ URL -> PUT ไฟล์ -> rerun พร้อม state ของ file_uploader
+    async def upload(self, name, data):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        proto, fragment_id = self.widget("ลากไฟล์มาวาง")
+        t0 = time.perf_counter()
+        back = BackMsg()
+        back.file_urls_request.request_id = uuid.uuid4().hex
+        back.file_urls_request.file_names.append(name)
+        back.file_urls_request.session_id = self.session_id
+        await self._send(back)
+        while True:
+            msg = await self._receive()
+            if msg.WhichOneof("type") == "file_urls_response" and msg.file_urls_response.response_id == back.file_urls_request.request_id:
+                break
+        if msg.file_urls_response.error_msg:
+            raise RuntimeError(msg.file_urls_response.error_msg)
+        urls = msg.file_urls_response.file_urls[0]
+        await asyncio.to_thread(put_file, self.base_url + urls.upload_url if urls.upload_url.startswith("/") else urls.upload_url, name, data)
+
+        state = WidgetState(id=proto.id)
+        info = state.file_uploader_state_value.uploaded_file_info.add()
+        info.file_id, info.name, info.size = urls.file_id, name, len(data)
+        info.file_urls.CopyFrom(urls)
+        self.states[proto.id] = state
+        await self.rerun(fragment_id)
+        return time.perf_counter() - t0
+
+
+def put_file(url, name, data):
+    boundary = uuid.uuid4().hex
+    body = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{name}"\r\n'
+        f"Content-Type: audio/wav\r\n\r\n".encode() + data + f"\r\n--{boundary}--\r\n".encode()
+    )
+    request = urllib.request.Request(url, data=body, method="PUT", headers={"Content-Type": f"multipart/form-data; boundary={boundary}"})
+    with urllib.request.urlopen(request, timeout=TIMEOUT) as response:
+        response.read()
+
+
+# ผู้ใช้หนึ่งคน: เปิดหน้า เลือกโหมดอัปโหลด แล้วอัปโหลดไฟล์ตามรอบเวลา
+async def operator(base_url, page, files, interval, jitter, stats):
+    session = Session(base_url, page)
+    try:
+        await asyncio.sleep(random.uniform(0, interval))
+        await session.connect()
+        stats["load"].append(await session.rerun())
+        await session.choose("เลือกรูปแบบเสียง", 1)
+        for i, path in enumerate(files):
+            if i:
+                await asyncio.sleep(max(interval + random.uniform(-jitter, jitter), 0))
+            with open(path, "rb") as f:
+                data = f.read()
+            stats["upload"].append(await session.upload(os.path.basename(path), data))
+            if session.exceptions:
+                stats["errors"].append(session.exceptions[0])
+            elif not any(RESULT_MARKER in m for m in session.markdown):
+                stats["no_result"] += 1
+    except Exception as e:  # session ล่ม (หมดเวลา/ตัดการเชื่อมต่อ) นับเป็น error แล้วไปต่อ
+        stats["errors"].append(f"{type(e).__name__}: {e}")
+    finally:
+        await session.close()
+
+
+async def run_level(base_url, plan, interval, jitter):
+    stats = {"load": [], "upload": [], "errors": [], "no_result": 0}
+    t0 = time.perf_counter()
+    await asyncio.gather(*(operator(base_url, page, files, interval, jitter, stats) for page, files in plan))
+    return time.perf_counter() - t0, stats
+
+
+def start_server(port, db, metrics_log):
+    env = dict(os.environ, INSPECTION_DB=db, INSPECTION_METRICS_LOG=metrics_log)
+    cmd = [
+        sys.executable, "-m", "streamlit", "run", "home.py",
+        "--server.headless=true", f"--server.port={port}", "--server.address=127.0.0.1",
+        "--server.enableXsrfProtection=false", "--server.fileWatcherType=none", "--browser.gatherUsageStats=false",
+    ]
+    process = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("streamlit exited during start-up")
+        try:
+            with urllib.request.urlopen(url + "/_stcore/health", timeout=1) as r:
+                if r.status == 200:
+                    return process, url
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("streamlit did not become healthy within 60 s")
+
+
+def free_port():
+    import socket
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# เวลาแต่ละขั้นตอนจาก metrics log ของ server ในช่วงเวลาของรอบนี้ (p95 ms)
+def stage_p95(metrics_log, since):
+    from inspection.metrics import read_log
+
+    samples = {}
+    try:
+        for trace in read_log(metrics_log):
+            if trace.started >= since:
+                for stage, (seconds, _) in trace.stages.items():
+                    samples.setdefault(stage, []).append(seconds)
+    except FileNotFoundError:
+        return {}
+    return {stage: float(np.percentile(v, 95)) * 1000 for stage, v in samples.items()}
+
+
+def print_level(row):
+    u = row["upload"]
+    ms = lambda v: "-" if v is None else f"{v * 1000:.0f}"  # noqa: E731
+    cpu = "-" if row["cpu_percent"] is None else f"{row['cpu_percent']:.0f}%"
+    rss = "-" if not row["rss_peak"] else f"{row['rss_peak'] / 2**20:.0f}"
+    print(
+        f"{row['sessions']:>8}{row['uploads']:>8}{row['errors']:>7}{row['no_result']:>7}{row['lost_rows']:>6}"
+        f"{ms(row['load']['p50']):>9}{ms(u['p50']):>8}{ms(u['p95']):>8}{ms(u['p99']):>8}{ms(u['max']):>8}"
+        f"{row['throughput']:>8.2f}{cpu:>7}{rss:>8}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load_sessions", description="Drive the Steel/Brick pages with many simultaneous sessions.")
+    parser.add_argument("--sessions", default="1,2,4,8", help="comma-separated concurrency levels, run in order")
+    parser.add_argument("--uploads", type=int, default=3, help="recordings uploaded per session")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds an operator waits between uploads")
+    parser.add_argument("--jitter", type=float, default=0.5, help="random +/- seconds added to each wait")
+    parser.add_argument("--pages", nargs="+", default=DEFAULT_PAGES, help="pages the sessions are spread over")
+    parser.add_argument("--data", default="Data/*_wav/*.wav", help="glob of recordings to upload")
+    parser.add_argument("--url", default=None, help="existing server (default: start `streamlit run home.py` on a temp database)")
+    parser.add_argument("--pid", type=int, default=None, help="existing server: process id for CPU/RSS")
+    parser.add_argument("--db", default=None, help="existing server: its results database, for lost-row counts")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    files = sorted(glob.glob(args.data))
+    if not files:
+        print(f"no recordings match {args.data}", file=sys.stderr)
+        return 1
+    random.seed(args.seed)
+    levels = [int(n) for n in args.sessions.split(",")]
+
+    process = None
+    metrics_log = None
+    if args.url is None:
+        tmp = tempfile.mkdtemp(prefix="load_sessions_")
+        db, metrics_log = os.path.join(tmp, "results.db"), os.path.join(tmp, "metrics.jsonl")
+        process, base_url = start_server(free_port(), db, metrics_log)
+        pid = process.pid
+    else:
+        base_url, pid, db = args.url.rstrip("/"), args.pid, args.db
+
+    store = ResultStore(db) if db else None
+    probe = ServerProbe(pid) if pid else None
+    digests = {}
+    seen = set()  # (วัสดุ, hash) ที่เคยอัปโหลดแล้ว ไม่นับซ้ำเป็นแถวที่ต้องเพิ่ม
+    cursor = 0
+    report = []
+    print(f"server {base_url}, {len(files)} recordings, {args.uploads} uploads per session every ~{args.interval:g}s")
+    print(f"{'sessions':>8}{'uploads':>8}{'errors':>7}{'no-res':>7}{'lost':>6}{'load50':>9}{'p50 ms':>8}{'p95':>8}{'p99':>8}{'max':>8}{'up/s':>8}{'cpu':>7}{'rss MiB':>8}")
+    try:
+        for n in levels:
+            # ไฟล์ต่อเนื่องข้ามรอบ (cache ผลวิเคราะห์ของ server ไม่ช่วยจนกว่าจะวนครบทุกไฟล์)
+            plan = []
+            expected = {}
+            for i in range(n):
+                page = args.pages[i % len(args.pages)]
+                chunk = [files[(cursor + j) % len(files)] for j in range(args.uploads)]
+                cursor += args.uploads
+                plan.append((page, chunk))
+                for path in chunk:
+                    if path not in digests:
+                        with open(path, "rb") as f:
+                            digests[path] = audio_digest(f.read())
+                    key = (MATERIALS.get(page, page), digests[path])
+                    if key not in seen:
+                        seen.add(key)
+                        expected[key[0]] = expected.get(key[0], 0) + 1
+            before = {m: store.count(m) for m in expected} if store else {}
+
+            since = time.time()
+            cpu0 = probe.cpu_seconds() if probe else None
+            if probe:
+                probe.start()
+            elapsed, stats = asyncio.run(run_level(base_url, plan, args.interval, args.jitter))
+            if probe:
+                probe.stop()
+            cpu1 = probe.cpu_seconds() if probe else None
+
+            lost = sum(expected[m] - (store.count(m) - before[m]) for m in expected) if store else 0
+            row = {
+                "sessions": n,
+                "uploads": len(stats["upload"]),
+                "errors": len(stats["errors"]),
+                "no_result": stats["no_result"],
+                "lost_rows": lost,
+                "load": percentiles(stats["load"]),
+                "upload": percentiles(stats["upload"]),
+                "throughput": len(stats["upload"]) / elapsed,
+                "cpu_percent": None if cpu0 is None or cpu1 is None else (cpu1 - cpu0) / elapsed * 100,
+                "rss_peak": probe.rss_peak if probe else None,
+                "stage_p95_ms": stage_p95(metrics_log, since) if metrics_log else {},
+                "first_errors": stats["errors"][:3],
+            }
+            report.append(row)
+            print_level(row)
+            for error in row["first_errors"]:
+                print(f"{'':>8}! {error}")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(10)
+
+    if metrics_log and report:
+        print("server stage p95 (ms) per level:")
+        seen_stages = {s for row in report for s in row["stage_p95_ms"]}
+        stages = [s for s in STAGES if s in seen_stages]
+        print(f"{'sessions':>8}" + "".join(f"{s:>9}" for s in stages))
+        for row in report:
+            print(f"{row['sessions']:>8}" + "".join(f"{row['stage_p95_ms'].get(s, float('nan')):>9.1f}" for s in stages))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"url": base_url, "uploads_per_session": args.uploads, "interval": args.interval, "levels": report}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,16 @@
 import streamlit as st
-from PIL import Image
-from io import BytesIO
-import base64
+
+from inspection.assets import data_uri
+from inspection.warmup import start_if_enabled
 
 st.set_page_config(page_title="Acoustic Inspection Apps", page_icon="🔨", layout="wide")
 
-# --- ฟังก์ชันแปลงรูปเป็น base64 ---
-def image_to_base64(image_path):
-    img = Image.open(image_path)
-    buffered = BytesIO()
-    img.save(buffered, format="PNG")
-    img_bytes = buffered.getvalue()
-    return base64.b64encode(img_bytes).decode()
+# โหลดโมดูลวิเคราะห์ล่วงหน้าระหว่างผู้ใช้อยู่หน้าแรก (เปิดด้วย INSPECTION_WARMUP=1)
+start_if_enabled()
 
-# --- โหลดโลโก้ ---
-logo1_b64 = image_to_base64("images/logo1.png")
-logo2_b64 = image_to_base64("images/logo2.png")
+# --- โหลดโลโก้ (แปลงครั้งเดียวต่อ process ย่อตามความสูงที่แสดง) ---
+logo1_uri = data_uri("images/logo1.png", height=120)
+logo2_uri = data_uri("images/logo2.png", height=120)
 
 # --- CSS แต่งสไตล์ ---
 st.markdown(f"""
@@ -158,8 +153,8 @@ h1 {{
 # --- แสดงโลโก้ ---
 st.markdown(f"""
 <div class="logo-bar">
-    <img src="data:image/png;base64,{logo1_b64}" alt="logo1">
-    <img src="data:image/png;base64,{logo2_b64}" alt="logo2">
+    <img src="{logo1_uri}" alt="logo1">
+    <img src="{logo2_uri}" alt="logo2">
 </div>
 """, unsafe_allow_html=True)
 
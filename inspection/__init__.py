@@ -0,0 +1,30 @@
+# โหลดโมดูลย่อยเมื่อใช้ชื่อนั้นครั้งแรก: from inspection import STEEL ไม่ต้อง import numpy
+from importlib import import_module
+
+_EXPORTS = {
+    "DEFECTIVE": "engine",
+    "GOOD": "engine",
+    "TOO_LOUD": "engine",
+    "InspectionResult": "engine",
+    "analyze": "engine",
+    "classify": "engine",
+    "load_audio": "engine",
+    "BRICK": "profiles",
+    "PROFILES": "profiles",
+    "STEEL": "profiles",
+    "MaterialProfile": "profiles",
+    "get_profile": "profiles",
+}
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
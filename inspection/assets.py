@@ -0,0 +1,61 @@
+# รูปภาพสำหรับหน้า Home/Guide แปลงเป็น data URI ครั้งเดียว
+#
+# ย่อให้พอดีกับขนาดที่แสดงจริง (x2 สำหรับจอความละเอียดสูง) แล้วบีบอัดเป็น WebP
+# ผลเก็บทั้งใน process (lru_cache) และเป็นไฟล์ใน .cache ข้างรูป ให้ process ใหม่
+# หลังรีสตาร์ตไม่ต้องแปลงซ้ำ cache ผูกกับ mtime + ขนาดไฟล์ แก้รูปแล้วสร้างใหม่เอง
+import base64
+import os
+from functools import lru_cache
+from io import BytesIO
+
+SCALE = 2  # พิกเซลจริงต่อพิกเซลที่แสดง
+QUALITY = 85
+CACHE_DIR = os.environ.get("INSPECTION_ASSET_CACHE")  # None = โฟลเดอร์ .cache ข้างรูป
+
+
+def _cache_path(path, mtime_ns, size, width, height, quality):
+    folder = CACHE_DIR or os.path.join(os.path.dirname(path), ".cache")
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(folder, f"{stem}-{width}x{height}-q{quality}-{mtime_ns}-{size}.uri")
+
+
+def _render(path, width, height, quality):
+    from PIL import Image
+
+    with Image.open(path) as img:
+        box = (width * SCALE if width else img.width, height * SCALE if height else img.height)
+        img.thumbnail(box, Image.LANCZOS)  # ย่ออย่างเดียว ไม่ขยาย
+        buffered = BytesIO()
+        img.save(buffered, format="WEBP", quality=quality, method=4)
+    return "data:image/webp;base64," + base64.b64encode(buffered.getvalue()).decode()
+
+
+@lru_cache(maxsize=64)
+def _encode(path, mtime_ns, size, width, height, quality):
+    cached = _cache_path(path, mtime_ns, size, width, height, quality)
+    try:
+        with open(cached) as f:
+            return f.read()
+    except OSError:
+        pass
+
+    uri = _render(path, width, height, quality)
+    try:
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+        tmp = f"{cached}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(uri)
+        os.replace(tmp, cached)
+    except OSError:
+        pass  # โฟลเดอร์เขียนไม่ได้ ใช้ cache ใน process อย่างเดียว
+    return uri
+
+
+# width/height คือขนาดที่แสดงบนหน้าเว็บ (px) ไม่ระบุ = ใช้ขนาดเดิม
+def data_uri(path, width=None, height=None, quality=QUALITY):
+    st = os.stat(path)
+    return _encode(os.path.abspath(path), st.st_mtime_ns, st.st_size, width, height, quality)
+
+
+def clear():
+    _encode.cache_clear()
@@ -0,0 +1,214 @@
+# ตรวจสอบไฟล์ .wav ทั้งโฟลเดอร์แบบ headless (ไม่ต้องเปิด Streamlit)
+#
+#   python -m inspection.batch Data --material steel --out results.csv
+#   python -m inspection.batch Data/.corpus --material steel    # archive จาก inspection.corpus
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .engine import DEFECTIVE, GOOD, TOO_LOUD, analyze, load_audio
+from .profiles import PROFILES, get_profile
+from .quality import REASONS, gate, gate_source
+from .resample import analyze_decimated
+from .streaming import analyze_stream
+
+# ชื่อโฟลเดอร์ -> ผลที่คาดหวัง (ตามโครงสร้างใน Data/)
+DEFAULT_LABELS = {
+    "Good_wav": GOOD,
+    "TG_wav": GOOD,
+    "Bad_wav": DEFECTIVE,
+    "TB_wav": DEFECTIVE,
+}
+# โฟลเดอร์ใน Data/ เป็นเสียงเคาะเหล็ก วัสดุอื่นต้องระบุโฟลเดอร์เองด้วย --label
+MATERIAL_LABELS = {"steel": DEFAULT_LABELS}
+
+COLUMNS = ["File", "Expected", "Peak Frequency (Hz)", "Peak Amplitude", "Result", "Error"]
+VERDICTS = [GOOD, DEFECTIVE, TOO_LOUD]
+
+
+def find_wavs(root):
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        paths.extend(os.path.join(dirpath, f) for f in sorted(filenames) if f.lower().endswith(".wav"))
+    return paths
+
+
+def expected_label(path, labels):
+    return labels.get(os.path.basename(os.path.dirname(path)), "")
+
+
+def _row(path, r=None, error=""):
+    if r is None:
+        return {"File": path, "Peak Frequency (Hz)": "", "Peak Amplitude": "", "Result": "", "Error": error}
+    return {"File": path, "Peak Frequency (Hz)": r.peak_freq, "Peak Amplitude": r.peak_amp, "Result": r.result, "Error": ""}
+
+
+def inspect_file(path, material, dtype=np.float64, stream=False, decimate=False):
+    profile = get_profile(material)
+    try:
+        if stream:
+            gate_source(path)
+            r = analyze_stream(path, profile)
+        elif decimate:
+            y, sr = load_audio(path)
+            gate(y)
+            r = analyze_decimated(y, sr, profile, dtype)
+        else:
+            y, sr = load_audio(path)
+            gate(y)
+            r = analyze(y, sr, profile, dtype)
+    except Exception as e:  # ไฟล์เสียหาย/อ่านไม่ได้ ไม่ควรทำให้ทั้ง batch ล้ม
+        return _row(path, error=str(e))
+    return _row(path, r)
+
+
+def _inspect_chunk(args):
+    paths, material, dtype, stream, decimate = args
+    return [inspect_file(p, material, dtype, stream, decimate) for p in paths]
+
+
+# ไฟล์ใน archive ของ inspection.corpus: worker แต่ละตัวเปิด archive เอง (memory-map ใช้หน้าเดียวกัน)
+def _inspect_corpus_chunk(args):
+    from .corpus import open_corpus
+
+    directory, rows, material, dtype, decimate = args
+    corpus = open_corpus(directory)
+    profile = get_profile(material)
+    out = []
+    for i in rows:
+        entry = corpus.entries[i]
+        try:
+            y, sr = corpus[i]
+            gate(y)
+            r = analyze_decimated(y, sr, profile, dtype) if decimate else analyze(y, sr, profile, dtype)
+        except Exception as e:  # เหมือน inspect_file: รายการที่เสียไม่ควรทำให้ทั้ง batch ล้ม
+            out.append({**_row(entry["path"], error=str(e)), "Expected": entry["label"]})
+            continue
+        out.append({**_row(entry["path"], r), "Expected": entry["label"]})
+    return out
+
+
+def run_batch(paths, material, workers=None, dtype=np.float64, chunksize=8, stream=False, decimate=False):
+    workers = workers or os.cpu_count() or 1
+    chunks = [(paths[i:i + chunksize], material, dtype, stream, decimate) for i in range(0, len(paths), chunksize)]
+    if workers == 1:
+        return [row for chunk in map(_inspect_chunk, chunks) for row in chunk]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [row for chunk in pool.map(_inspect_chunk, chunks) for row in chunk]
+
+
+# เหมือน run_batch แต่อ่านจาก archive (ผลที่คาดหวังตามที่บันทึกไว้ตอนแพ็ก)
+def run_corpus(directory, material, workers=None, dtype=np.float64, chunksize=32, decimate=False):
+    from .corpus import open_corpus
+
+    workers = workers or os.cpu_count() or 1
+    n = len(open_corpus(directory))
+    chunks = [(directory, range(i, min(i + chunksize, n)), material, dtype, decimate) for i in range(0, n, chunksize)]
+    if workers == 1:
+        return [row for chunk in map(_inspect_corpus_chunk, chunks) for row in chunk]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [row for chunk in pool.map(_inspect_corpus_chunk, chunks) for row in chunk]
+
+
+def confusion_matrix(rows):
+    labels = sorted({r["Expected"] for r in rows if r["Expected"]}, key=VERDICTS.index)
+    counts = {(e, p): 0 for e in labels for p in VERDICTS}
+    for r in rows:
+        if r["Expected"] and r["Result"]:
+            counts[(r["Expected"], r["Result"])] += 1
+    return labels, counts
+
+
+def format_confusion(labels, counts):
+    head = "expected \\ predicted"
+    first = max(len(v) for v in labels + [head]) + 2
+    width = max(len(v) for v in VERDICTS) + 2
+    lines = [head.ljust(first) + "".join(v.rjust(width) for v in VERDICTS)]
+    for e in labels:
+        lines.append(e.ljust(first) + "".join(str(counts[(e, p)]).rjust(width) for p in VERDICTS))
+    correct = sum(counts[(e, e)] for e in labels)
+    total = sum(counts.values())
+    if total:
+        lines.append(f"accuracy: {correct}/{total} = {correct / total:.1%}")
+    return "\n".join(lines)
+
+
+def write_table(rows, out):
+    if out.lower().endswith(".xlsx"):
+        import pandas as pd
+
+        pd.DataFrame(rows, columns=COLUMNS).to_excel(out, index=False)
+        return
+    with open(out, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def parse_labels(items, base=DEFAULT_LABELS):
+    labels = dict(base)
+    for item in items or ():
+        folder, _, label = item.partition("=")
+        if not label:
+            raise argparse.ArgumentTypeError(f"--label expects FOLDER=LABEL, got {item!r}")
+        labels[folder] = label
+    return labels
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m inspection.batch", description="Inspect every .wav under a directory.")
+    parser.add_argument("root", help="directory to scan recursively, or an archive from inspection.corpus")
+    parser.add_argument("--material", choices=sorted(PROFILES), default="steel")
+    parser.add_argument("--out", default="batch_results.csv", help="results table (.csv or .xlsx)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--float32", action="store_true", help="use the float32 analysis path")
+    parser.add_argument("--stream", action="store_true", help="block-wise Welch analysis (bounded memory for long recordings)")
+    parser.add_argument("--decimate", action="store_true", help="low-pass and decimate to the material's band before the FFT")
+    parser.add_argument("--label", action="append", metavar="FOLDER=LABEL", help="map a folder name to an expected verdict")
+    args = parser.parse_args(argv)
+
+    from .corpus import is_corpus
+
+    dtype = np.float32 if args.float32 else np.float64
+    if is_corpus(args.root):
+        if args.stream or args.label:
+            parser.error("--stream and --label apply to .wav directories (an archive keeps the labels it was packed with)")
+        t0 = time.perf_counter()
+        rows = run_corpus(args.root, args.material, args.workers, dtype, decimate=args.decimate)
+        elapsed = time.perf_counter() - t0
+    else:
+        labels = parse_labels(args.label)
+        paths = find_wavs(args.root)
+        if not paths:
+            print(f"no .wav files under {args.root}", file=sys.stderr)
+            return 1
+
+        t0 = time.perf_counter()
+        rows = run_batch(paths, args.material, args.workers, dtype, stream=args.stream, decimate=args.decimate)
+        elapsed = time.perf_counter() - t0
+        for row in rows:
+            row["Expected"] = expected_label(row["File"], labels)
+    if not rows:
+        print(f"no recordings in {args.root}", file=sys.stderr)
+        return 1
+
+    write_table(rows, args.out)
+    rejected = sum(1 for r in rows if r["Error"].partition(":")[0] in REASONS)
+    errors = sum(1 for r in rows if r["Error"]) - rejected
+    print(f"{len(rows)} files in {elapsed:.2f}s ({len(rows) / elapsed:.1f} files/s), {errors} errors, {rejected} rejected by the quality gate -> {args.out}")
+
+    labels_found, counts = confusion_matrix(rows)
+    if labels_found:
+        print()
+        print(format_confusion(labels_found, counts))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
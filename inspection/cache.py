@@ -0,0 +1,149 @@
+# cache ผลวิเคราะห์ตาม hash ของไฟล์เสียง + ค่าของวัสดุ + วิธีวิเคราะห์
+# ใช้ร่วมกันทุก session (LRU จำกัดขนาดเป็นไบต์) และเก็บลงดิสก์ได้ถ้าระบุโฟลเดอร์
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass
+
+import numpy as np
+
+DEFAULT_MAX_BYTES = 256 * 2**20
+DEFAULT_DISK_BYTES = 1024 * 2**20
+CACHE_DIR = os.environ.get("INSPECTION_CACHE_DIR") or None
+# เพิ่มค่านี้ทุกครั้งที่ผลวิเคราะห์ของไฟล์เดิมเปลี่ยน (ยอด/แอมพลิจูด/ผลตัดสิน หรือรูปแบบของผลลัพธ์)
+# ผลเก่าที่เก็บบนดิสก์จะไม่ถูกใช้อีก และถูกลบออกตามลำดับ LRU
+# 2: decimate ตรวจยอดนอก passband, แอมพลิจูดของ taps เทียบเท่าทั้งไฟล์, window ของ taps ใหม่
+ANALYSIS_VERSION = 2
+
+
+def audio_digest(data):
+    h = hashlib.blake2b(digest_size=20)
+    for chunk in (data,) if isinstance(data, (bytes, bytearray, memoryview)) else iter(lambda: data.read(2**20), b""):
+        h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_key(digest, profile, method):
+    return f"v{ANALYSIS_VERSION}-{digest}-{profile.key}-{profile.freq_low:g}-{profile.freq_high:g}-{profile.max_amplitude:g}-{method}"
+
+
+def sizeof(value):
+    if is_dataclass(value):
+        return 256 + sum(sizeof(getattr(value, f.name)) for f in fields(value))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return 64 + sum(sizeof(v) for v in value)
+    return 64
+
+
+class AnalysisCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, directory=CACHE_DIR, disk_bytes=DEFAULT_DISK_BYTES):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.disk_bytes = disk_bytes
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+        value = self._load(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self._remember(key, value)
+        return value
+
+    def put(self, key, value):
+        self._remember(key, value)
+        self._save(key, value)
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remember(self, key, value):
+        size = sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def _load(self, key):
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None  # ไฟล์เสีย หรือ pickle ของคลาสที่เปลี่ยนไปแล้ว
+        os.utime(path)  # อายุของไฟล์ใช้เป็นลำดับ LRU บนดิสก์
+        return value
+
+    def _save(self, key, value):
+        if not self.directory:
+            return
+        # เขียนลงไฟล์ชั่วคราวก่อนแล้วค่อย rename เพื่อไม่ให้ session อื่นอ่านไฟล์ที่เขียนไม่เสร็จ
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        self._trim_disk()
+
+    def _trim_disk(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for e in it:
+                if e.name.endswith(".pkl"):
+                    st = e.stat()
+                    entries.append((st.st_mtime, st.st_size, e.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
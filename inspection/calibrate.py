@@ -0,0 +1,240 @@
+# ปรับช่วงความถี่และแอมพลิจูดสูงสุดที่ยอมรับ จากไฟล์เสียงที่รู้ผล (Good_wav/Bad_wav, TG_wav/TB_wav)
+# โฟลเดอร์ใน Data/ เป็นของเหล็ก วัสดุอื่นต้องระบุด้วย --label FOLDER=LABEL
+#
+#   python -m inspection.calibrate Data --material steel                  # รายงานจุดทำงานที่ดีที่สุด
+#   python -m inspection.calibrate Data --plot calibration.png --write    # บันทึกลง profiles.json
+#
+# ใช้ยอดจาก feature index (inspection.features) แล้วประเมินทุกชุด (low, high, max_amplitude)
+# ในครั้งเดียว: จำนวนไฟล์ที่ผ่าน = #(f <= high, a <= amp) - #(f < low, a <= amp)
+# ทั้งสองพจน์ได้จากการคูณเมทริกซ์ indicator ไม่ต้องวนทีละชุด
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from .batch import MATERIAL_LABELS, parse_labels
+from .engine import DEFECTIVE, GOOD
+from .features import update_index
+from .profiles import CONFIG_FILE, PROFILES, TUNABLE, get_profile, write_config
+
+SEARCH_WIDTHS = 5  # ค้นหาขอบช่วงความถี่ในแถบเดิม ± กี่เท่าของความกว้างแถบ
+AMP_STEPS = 32
+OBJECTIVES = ["accuracy", "balanced", "f1"]
+
+
+@dataclass
+class Sweep:
+    lows: np.ndarray
+    highs: np.ndarray
+    amps: np.ndarray
+    good_pass: np.ndarray  # (amps, lows, highs) จำนวนไฟล์ Good ที่ผ่าน
+    bad_pass: np.ndarray  # (amps, lows, highs) จำนวนไฟล์ Defective ที่ผ่าน (หลุด)
+    n_good: int
+    n_bad: int
+
+    @property
+    def valid(self):
+        return np.broadcast_to(self.lows[None, :, None] <= self.highs[None, None, :], self.good_pass.shape)
+
+    def rates(self):
+        return rates(self.good_pass, self.bad_pass, self.n_good, self.n_bad)
+
+    def point(self, k, i, j):
+        return {
+            "freq_low": float(self.lows[i]),
+            "freq_high": float(self.highs[j]),
+            "max_amplitude": float(self.amps[k]),
+            **{name: float(v) for name, v in rates(self.good_pass[k, i, j], self.bad_pass[k, i, j], self.n_good, self.n_bad).items()},
+        }
+
+    # จุดทำงานที่ดีที่สุด เสมอกันเลือกที่ใกล้ค่าเดิมที่สุด
+    def best(self, profile, objective="accuracy", max_false_reject=None, top=5):
+        ok = self.valid
+        if max_false_reject is not None:
+            ok = ok & (self.good_pass >= (1 - max_false_reject) * self.n_good)
+        cells = np.flatnonzero(ok)
+        if not len(cells):
+            return []
+        score = rates(self.good_pass.ravel()[cells], self.bad_pass.ravel()[cells], self.n_good, self.n_bad)[objective]
+
+        # ตัดเหลือเฉพาะชุดที่คะแนนติดอันดับ (รวมที่เสมอกัน) แล้วจึงเรียงตามระยะจากค่าเดิม
+        cutoff = np.partition(score, -min(top, len(score)))[-min(top, len(score))]
+        cells, score = cells[score >= cutoff], score[score >= cutoff]
+        k, i, j = np.unravel_index(cells, self.good_pass.shape)
+        width = profile.freq_high - profile.freq_low
+        shift = (np.abs(self.lows[i] - profile.freq_low) + np.abs(self.highs[j] - profile.freq_high)) / width
+        shift += np.abs(np.log(self.amps[k] / profile.max_amplitude))
+        order = np.lexsort((shift, -score))[:top]
+        return [self.point(k[n], i[n], j[n]) for n in order]
+
+    # ขอบของ ROC/PR ที่ทำได้จากทุกชุด (ดีที่สุดต่ออัตราตีตกของดี / ต่อจำนวนของเสียที่จับได้)
+    def frontiers(self):
+        valid = self.valid.ravel()
+        good_pass = self.good_pass.ravel()[valid]
+        caught = self.n_bad - self.bad_pass.ravel()[valid]
+        best_caught = np.full(self.n_good + 1, -1)
+        np.maximum.at(best_caught, good_pass, caught)
+        best_caught = np.maximum.accumulate(best_caught[::-1])[::-1]  # ยอมตีตกของดีได้ไม่เกินเท่านี้
+        roc = (1 - np.arange(self.n_good + 1) / self.n_good, best_caught / self.n_bad)
+
+        wrongly_rejected = self.n_good - good_pass
+        fewest = np.full(self.n_bad + 1, self.n_good + 1)
+        np.minimum.at(fewest, caught, wrongly_rejected)
+        r = np.flatnonzero((fewest <= self.n_good) & (np.arange(self.n_bad + 1) > 0))
+        pr = (r / self.n_bad, r / (r + fewest[r]))
+        return roc, pr
+
+
+# detection = Defective ที่ถูกตีตก / Defective ทั้งหมด, false_reject = Good ที่ถูกตีตก / Good ทั้งหมด
+# precision = สัดส่วน Defective ในไฟล์ที่ถูกตีตก
+def rates(good_pass, bad_pass, n_good, n_bad):
+    good_pass, bad_pass = np.asarray(good_pass, dtype=float), np.asarray(bad_pass, dtype=float)
+    caught = n_bad - bad_pass
+    rejected = n_good - good_pass + caught
+    detection = caught / n_bad
+    false_reject = 1 - good_pass / n_good
+    precision = np.divide(caught, rejected, out=np.zeros_like(caught), where=rejected > 0)
+    return {
+        "accuracy": (good_pass + caught) / (n_good + n_bad),
+        "balanced": (detection + 1 - false_reject) / 2,
+        "f1": np.divide(2 * precision * detection, precision + detection, out=np.zeros_like(caught), where=(precision + detection) > 0),
+        "detection": detection,
+        "false_reject": false_reject,
+        "precision": precision,
+    }
+
+
+def _midpoints(values):
+    v = np.unique(values)
+    return (v[:-1] + v[1:]) / 2
+
+
+def frequency_candidates(peak_freqs, profile, widths=SEARCH_WIDTHS):
+    width = profile.freq_high - profile.freq_low
+    lo, hi = max(profile.freq_low - widths * width, 0.0), profile.freq_high + widths * width
+    f = np.asarray(peak_freqs)
+    mids = _midpoints(f[(f >= lo) & (f <= hi)])
+    return np.unique(np.concatenate((mids, [lo, hi, profile.freq_low, profile.freq_high])))
+
+
+def amplitude_candidates(peak_amps, profile, steps=AMP_STEPS):
+    q = np.quantile(np.asarray(peak_amps), np.linspace(0, 1, steps + 1))
+    return np.unique(np.concatenate((_midpoints(q), [profile.max_amplitude])))
+
+
+def sweep(peak_freqs, peak_amps, is_good, lows, highs, amps):
+    f = np.asarray(peak_freqs)[:, None]
+    amp_ok = (np.asarray(peak_amps)[:, None] <= amps[None, :]).astype(np.float32)
+    below_high = (f <= highs[None, :]).astype(np.float32)
+    below_low = (f < lows[None, :]).astype(np.float32)
+
+    def passed(rows):
+        a = amp_ok[rows].T
+        return (a @ below_high[rows])[:, None, :] - (a @ below_low[rows])[:, :, None]
+
+    good = np.asarray(is_good)
+    return Sweep(lows, highs, amps, passed(good).astype(np.int32), passed(~good).astype(np.int32), int(good.sum()), int((~good).sum()))
+
+
+def current_point(peak_freqs, peak_amps, is_good, profile):
+    s = sweep(peak_freqs, peak_amps, is_good, np.array([profile.freq_low]), np.array([profile.freq_high]), np.array([profile.max_amplitude], dtype=float))
+    return s.point(0, 0, 0)
+
+
+def plot(sweep_result, current, chosen, path, title):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    (fpr, tpr), (recall, precision) = sweep_result.frontiers()
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(11, 5))
+    ax1.step(fpr, tpr, where="post", label="best achievable")
+    ax1.plot(current["false_reject"], current["detection"], "x", color="gray", markersize=10, label="current")
+    ax1.plot(chosen["false_reject"], chosen["detection"], "*", color="red", markersize=14, label="chosen")
+    ax1.set(xlabel="false reject rate (good rejected)", ylabel="detection rate (defective rejected)", title="ROC", xlim=(0, 1), ylim=(0, 1.02))
+    ax2.plot(recall, precision, ".-", label="best achievable")
+    ax2.plot(current["detection"], current["precision"], "x", color="gray", markersize=10, label="current")
+    ax2.plot(chosen["detection"], chosen["precision"], "*", color="red", markersize=14, label="chosen")
+    ax2.set(xlabel="recall (detection rate)", ylabel="precision of rejections", title="Precision-recall", xlim=(0, 1), ylim=(0, 1.02))
+    for ax in (ax1, ax2):
+        ax.grid(True, alpha=0.3)
+        ax.legend(loc="lower right")
+    fig.suptitle(title)
+    fig.tight_layout()
+    fig.savefig(path, dpi=120)
+    plt.close(fig)
+
+
+def format_points(rows):
+    head = f"{'':<10}{'low':>9}{'high':>9}{'max amp':>9}{'acc':>7}{'bal':>7}{'f1':>7}{'detect':>8}{'f.rej':>7}{'prec':>7}"
+    lines = [head]
+    for name, r in rows:
+        lines.append(
+            f"{name:<10}{r['freq_low']:>9.1f}{r['freq_high']:>9.1f}{r['max_amplitude']:>9.0f}{r['accuracy']:>7.1%}{r['balanced']:>7.1%}"
+            f"{r['f1']:>7.1%}{r['detection']:>8.1%}{r['false_reject']:>7.1%}{r['precision']:>7.1%}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m inspection.calibrate", description="Choose acceptance thresholds from labelled recordings.")
+    parser.add_argument("root", help="directory with labelled recording folders")
+    parser.add_argument("--material", choices=sorted(PROFILES), default="steel")
+    parser.add_argument("--objective", choices=OBJECTIVES, default="accuracy")
+    parser.add_argument("--max-false-reject", type=float, default=None, help="only consider points rejecting at most this fraction of good parts")
+    parser.add_argument("--search-widths", type=float, default=SEARCH_WIDTHS, help="search the band edges within this many band widths of the current band")
+    parser.add_argument("--amp-steps", type=int, default=AMP_STEPS, help="number of amplitude limits to try")
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--label", action="append", metavar="FOLDER=LABEL", help="map a folder name to an expected verdict")
+    parser.add_argument("--plot", default=None, help="write ROC and precision-recall figures to this image")
+    parser.add_argument("--write", action="store_true", help=f"save the best point to the profile config ({CONFIG_FILE})")
+    args = parser.parse_args(argv)
+
+    profile = get_profile(args.material)
+    t0 = time.perf_counter()
+    folders = parse_labels(args.label, MATERIAL_LABELS.get(profile.key, {}))
+    if not folders:
+        print(f"no labelled folders for {profile.name}: pass --label FOLDER=LABEL", file=sys.stderr)
+        return 1
+    index, _ = update_index(args.root)
+    labels = index.labels(folders)
+    known = np.isin(labels, [GOOD, DEFECTIVE])
+    t_features = time.perf_counter() - t0
+    # ต้องมีทั้งตัวอย่างดีและเสีย ไม่เช่นนั้นจุดทำงานที่ได้ไม่มีความหมาย (และไม่เขียน config)
+    if not (labels[known] == GOOD).any() or not (labels[known] == DEFECTIVE).any():
+        print(f"{profile.name} needs both good and defective recordings under {args.root} (found {known.sum()} labelled)", file=sys.stderr)
+        return 1
+    freqs, amps, is_good = np.asarray(index["peak_freq"])[known], np.asarray(index["peak_amp"])[known], labels[known] == GOOD
+
+    t0 = time.perf_counter()
+    lows = highs = frequency_candidates(freqs, profile, args.search_widths)
+    amp_limits = amplitude_candidates(amps, profile, args.amp_steps)
+    result = sweep(freqs, amps, is_good, lows, highs, amp_limits)
+    points = result.best(profile, args.objective, args.max_false_reject, args.top)
+    t_sweep = time.perf_counter() - t0
+
+    combos = int(result.valid.sum())
+    print(f"{known.sum()} labelled recordings ({result.n_good} good, {result.n_bad} defective); features {t_features * 1000:.0f} ms")
+    print(f"{combos} threshold combinations swept in {t_sweep * 1000:.1f} ms")
+    if not points:
+        print("no operating point satisfies the constraints", file=sys.stderr)
+        return 1
+
+    current = current_point(freqs, amps, is_good, profile)
+    print()
+    print(format_points([("current", current)] + [(f"#{i + 1}", p) for i, p in enumerate(points)]))
+
+    if args.plot:
+        plot(result, current, points[0], args.plot, f"{profile.name}: {combos} threshold combinations")
+        print(f"figures -> {args.plot}")
+    if args.write:
+        write_config(profile.key, {k: round(points[0][k], 1) for k in TUNABLE})
+        print(f"{profile.name} thresholds -> {CONFIG_FILE} (restart the app to load them)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
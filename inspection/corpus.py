@@ -0,0 +1,293 @@
+# คลังเสียงแบบแพ็ก: ตัวอย่างเสียงของทุกไฟล์ต่อกันในไฟล์เดียว พร้อมดัชนี offset/ความยาว/sample rate/ผลที่คาดหวัง
+# สแกนทั้งคลังด้วย memory-map (ไม่ต้องเปิดและแยก header ทีละไฟล์) หรืออ่านเรียงตามลำดับทีละไฟล์
+#
+#   python -m inspection.corpus Data                  # สร้าง/ต่อท้าย Data/.corpus ด้วยไฟล์ใหม่หรือที่เปลี่ยน
+#   python -m inspection.corpus Data --rebuild --dtype float32
+#   python -m inspection.corpus Data --scan           # เทียบเวลาสแกนทั้งคลัง: archive กับเปิดทีละไฟล์
+#   python -m inspection.batch Data/.corpus --material steel
+#
+# เก็บเฉพาะ channel ที่วิเคราะห์ (channel แรก) เป็นชนิดเดียวทั้งคลัง (ค่าเริ่มต้น int16 เหมือนไฟล์ใน Data/)
+# ไฟล์ใหม่ต่อท้าย samples แล้วจึงเขียน manifest แบบ atomic ผู้อ่านที่ map ไว้จึงเห็นชุดเก่าหรือชุดใหม่ทั้งชุด
+# ไฟล์ที่ถูกลบ/เปลี่ยนทิ้งช่องว่างไว้ในไฟล์ samples จนกว่าจะ compact (อัตโนมัติเมื่อเกิน COMPACT_RATIO)
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from . import wav
+from .batch import DEFAULT_LABELS, expected_label, find_wavs, parse_labels
+from .engine import load_audio
+
+VERSION = 1
+CORPUS_DIR = ".corpus"  # ค่าเริ่มต้น: โฟลเดอร์ย่อยในโฟลเดอร์คลังเสียง
+MANIFEST = "manifest.json"
+DTYPES = {"int16": "<i2", "int32": "<i4", "float32": "<f4"}
+COMPACT_RATIO = 0.5  # ช่องว่างเกินสัดส่วนนี้ของไฟล์ samples เขียนไฟล์ใหม่ให้แน่น
+INDEX_DTYPE = np.dtype([("offset", "<i8"), ("length", "<i8"), ("sample_rate", "<i4")])  # offset/length นับเป็นตัวอย่าง
+
+
+@dataclass
+class Corpus:
+    directory: str
+    entries: list  # [{"path", "size", "mtime_ns", "label"}] path สัมพัทธ์กับโฟลเดอร์คลังเสียงที่แพ็ก
+    index: np.ndarray  # INDEX_DTYPE แถวละไฟล์ ตรงกับ entries
+    samples: np.ndarray  # ตัวอย่างทั้งคลัง (memory-mapped เมื่อ mmap=True)
+    generation: int = 0  # เปลี่ยนเมื่อเขียนไฟล์ samples ใหม่ (rebuild/compact)
+    revision: int = 0  # เปลี่ยนทุกครั้งที่ดัชนีเปลี่ยน (ต่อท้ายในไฟล์ samples เดิม)
+
+    def __len__(self):
+        return len(self.entries)
+
+    # (ตัวอย่างเสียง, sample rate) ของไฟล์ที่ i เป็น view ของ samples ไม่คัดลอก
+    def __getitem__(self, i):
+        offset, length, sr = self.index[i].tolist()
+        return self.samples[offset : offset + length], sr
+
+    @property
+    def paths(self):
+        return [e["path"] for e in self.entries]
+
+    @property
+    def labels(self):
+        return np.array([e["label"] for e in self.entries])
+
+    @property
+    def dtype(self):
+        return self.samples.dtype
+
+    # ไบต์ในไฟล์ samples ที่ไม่มีไฟล์ใดอ้างถึงแล้ว
+    @property
+    def garbage(self):
+        return (len(self.samples) - int(self.index["length"].sum())) * self.dtype.itemsize
+
+    # อ่านเรียงตามตำแหน่งในไฟล์ด้วย read ธรรมดา (ไม่ใช้ mmap) คืน (i, ตัวอย่างเสียง, sample rate)
+    def stream(self, indices=None):
+        indices = range(len(self)) if indices is None else indices
+        order = sorted(indices, key=lambda i: self.index[i]["offset"])
+        with open(samples_path(self.directory, self.generation), "rb") as f:
+            for i in order:
+                offset, length, sr = self.index[i].tolist()
+                f.seek(offset * self.dtype.itemsize)
+                yield i, np.fromfile(f, self.dtype, length), sr
+
+
+def default_directory(root):
+    return os.path.join(root, CORPUS_DIR)
+
+
+def samples_path(directory, generation):
+    return os.path.join(directory, f"samples.{generation}.bin")
+
+
+def _index_path(directory, generation, revision):
+    return os.path.join(directory, f"index.{generation}.{revision}.npy")
+
+
+def _read_manifest(directory):
+    with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest["version"] != VERSION:
+        raise ValueError(f"corpus {directory} has version {manifest['version']}, expected {VERSION}; rebuild it")
+    return manifest
+
+
+# generation ล่าสุดในโฟลเดอร์ (แม้ manifest จะเป็นรุ่นเก่า) ไม่เขียนทับไฟล์ที่ผู้อ่านอาจ map อยู่
+def _last_generation(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+            return int(json.load(f)["generation"])
+    except (OSError, ValueError, KeyError):
+        return 0
+
+
+def is_corpus(directory):
+    return os.path.isfile(os.path.join(directory, MANIFEST))
+
+
+def open_corpus(directory, mmap=True):
+    manifest = _read_manifest(directory)
+    gen, end = manifest["generation"], manifest["end"]
+    dtype = np.dtype(manifest["dtype"])
+    index = np.load(_index_path(directory, gen, manifest["revision"]))
+    path = samples_path(directory, gen)
+    # ใช้แค่ส่วนที่ manifest รู้จัก (ท้ายไฟล์อาจมีข้อมูลจากการต่อท้ายที่ยังไม่เสร็จ)
+    if not end:
+        samples = np.empty(0, dtype)
+    elif mmap:
+        samples = np.memmap(path, dtype, mode="r", shape=(end // dtype.itemsize,))
+    else:
+        samples = np.fromfile(path, dtype, end // dtype.itemsize)
+    return Corpus(directory, manifest["entries"], index, samples, gen, manifest["revision"])
+
+
+# แปลงเป็นชนิดของคลัง เทียบเต็มสเกลต่อเต็มสเกล (int24/int32 -> int16 ปัดเศษ, float ตัดที่ ±1)
+def to_dtype(y, dtype):
+    if y.dtype == dtype:
+        return y
+    x = y * (1 / wav.full_scale(y))
+    if np.issubdtype(dtype, np.integer):
+        s = wav.full_scale(np.empty(0, dtype))
+        x = np.clip(np.rint(x * s), -s, s - 1)
+    return x.astype(dtype)
+
+
+def _write_manifest(directory, manifest, index):
+    os.makedirs(directory, exist_ok=True)
+    np.save(_index_path(directory, manifest["generation"], manifest["revision"]), index)
+    tmp = os.path.join(directory, f"{MANIFEST}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, os.path.join(directory, MANIFEST))
+
+    keep = {os.path.basename(_index_path(directory, manifest["generation"], manifest["revision"])),
+            os.path.basename(samples_path(directory, manifest["generation"]))}
+    for name in os.listdir(directory):
+        if name.endswith((".npy", ".bin")) and name not in keep:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass  # อาจถูก process อื่น memory-map อยู่ (Windows)
+
+
+# สแกน root แล้วต่อท้ายเฉพาะไฟล์ใหม่หรือที่ขนาด/mtime เปลี่ยน คืน (corpus, สถิติ)
+def pack(root, directory=None, labels=DEFAULT_LABELS, dtype=None, rebuild=False):
+    directory = directory or default_directory(root)
+    old = None
+    if not rebuild:
+        try:
+            old = open_corpus(directory)
+        except (OSError, ValueError, KeyError):
+            old = None
+    if old is not None and dtype is not None and np.dtype(dtype) != old.dtype:
+        raise ValueError(f"corpus {directory} stores {old.dtype}, use rebuild=True to change it to {np.dtype(dtype)}")
+    dtype = old.dtype if old is not None else np.dtype(dtype or DTYPES["int16"])
+    known = {e["path"]: i for i, e in enumerate(old.entries)} if old else {}
+
+    scanned = []
+    for path in find_wavs(root):
+        st = os.stat(path)
+        rel = os.path.relpath(path, root)
+        scanned.append({"path": rel, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "label": expected_label(path, labels)})
+
+    keep, todo = [], []
+    for e in scanned:
+        i = known.get(e["path"])
+        if i is not None and old.entries[i]["size"] == e["size"] and old.entries[i]["mtime_ns"] == e["mtime_ns"]:
+            keep.append((e, i))
+        else:
+            todo.append(e)
+
+    removed = len(set(known) - {e["path"] for e in scanned})
+    live = int(old.index["length"][[i for _, i in keep]].sum()) * dtype.itemsize if keep else 0
+    end = len(old.samples) * dtype.itemsize if old is not None else 0
+    compact = old is not None and (todo or removed) and end - live > COMPACT_RATIO * end
+    if old is None or compact:
+        gen, end = _last_generation(directory) + 1, 0
+    else:
+        gen = old.generation
+
+    rows, entries, errors = [], [], {}
+    path = samples_path(directory, gen)
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "r+b" if end else "wb") as f:
+        f.truncate(end)  # ตัดข้อมูลจากการต่อท้ายครั้งก่อนที่ไม่เสร็จ
+        f.seek(end)
+
+        def append(y, sr):
+            nonlocal end
+            offset = end // dtype.itemsize
+            block = np.ascontiguousarray(to_dtype(y, dtype))
+            f.write(block.data)
+            end += block.nbytes
+            return offset, len(block), sr
+
+        for e, i in keep:
+            entries.append(e)
+            if gen == old.generation:
+                rows.append(tuple(old.index[i].tolist()))
+            else:
+                rows.append(append(*old[i]))
+        for e in todo:
+            try:
+                y, sr = load_audio(os.path.join(root, e["path"]))
+            except Exception as exc:  # ไฟล์เสียหาย/อ่านไม่ได้ ข้ามไป ไม่ให้ทั้งคลังล้ม
+                errors[e["path"]] = str(exc)
+                continue
+            entries.append(e)
+            rows.append(append(y, sr))
+        f.flush()
+        os.fsync(f.fileno())
+
+    order = sorted(range(len(entries)), key=lambda k: entries[k]["path"])
+    index = np.array([rows[k] for k in order], INDEX_DTYPE)
+    entries = [entries[k] for k in order]
+    relabelled = old is not None and any(old.entries[i]["label"] != e["label"] for e, i in keep)
+    stats = {
+        "new": sum(1 for e in todo if e["path"] not in known and e["path"] not in errors),
+        "changed": sum(1 for e in todo if e["path"] in known and e["path"] not in errors),
+        "unchanged": len(keep),
+        "removed": removed,
+        "compacted": bool(compact),
+        "errors": errors,
+    }
+    if old is None or gen != old.generation or todo or removed or relabelled:
+        revision = old.revision + 1 if old is not None and gen == old.generation else 0
+        manifest = {"version": VERSION, "dtype": dtype.str, "generation": gen, "revision": revision, "end": end, "entries": entries}
+        _write_manifest(directory, manifest, index)
+    return open_corpus(directory), stats
+
+
+# อ่านทุกตัวอย่างของทั้งคลังหนึ่งรอบ (ค่าสูงสุด |y| ต่อไฟล์) คืน (วินาที, ไบต์ที่อ่าน)
+def _scan(recordings):
+    from .engine import peak_abs
+
+    t0 = time.perf_counter()
+    nbytes = 0
+    for y, _ in recordings:
+        peak_abs(y)
+        nbytes += y.nbytes
+    return time.perf_counter() - t0, nbytes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m inspection.corpus", description="Pack labelled recordings into one indexed sample archive.")
+    parser.add_argument("root", help="directory of recordings to pack")
+    parser.add_argument("--out", default=None, help=f"archive directory (default: ROOT/{CORPUS_DIR})")
+    parser.add_argument("--dtype", choices=sorted(DTYPES), default=None, help="sample type of a new archive (default: int16)")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the existing archive and repack every file")
+    parser.add_argument("--label", action="append", metavar="FOLDER=LABEL", help="map a folder name to an expected verdict")
+    parser.add_argument("--scan", action="store_true", help="time a whole-corpus scan from the archive and from the separate files")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    corpus, stats = pack(args.root, args.out, parse_labels(args.label), DTYPES.get(args.dtype), args.rebuild)
+    elapsed = time.perf_counter() - t0
+    for path, err in stats["errors"].items():
+        print(f"skipped {path}: {err}", file=sys.stderr)
+    print(
+        f"{len(corpus)} recordings packed in {elapsed:.2f}s: {stats['new']} new, {stats['changed']} changed, "
+        f"{stats['unchanged']} unchanged, {stats['removed']} removed, {len(stats['errors'])} errors"
+        f"{', compacted' if stats['compacted'] else ''} -> {corpus.directory} "
+        f"({corpus.samples.nbytes / 2**20:.1f} MiB {corpus.dtype}, {corpus.garbage / 2**20:.1f} MiB unused)"
+    )
+    counts = ", ".join(f"{label or '(unlabelled)'}: {n}" for label, n in zip(*np.unique(corpus.labels, return_counts=True)))
+    print(f"labels: {counts}")
+
+    if args.scan:
+        root = args.root
+        for name, recordings in (
+            ("archive (mmap)", (corpus[i] for i in range(len(corpus)))),
+            ("archive (read)", ((y, sr) for _, y, sr in corpus.stream())),
+            ("separate files", (load_audio(os.path.join(root, p)) for p in corpus.paths)),
+        ):
+            seconds, nbytes = _scan(recordings)
+            print(f"scan {name:<15} {seconds * 1000:8.1f} ms  {nbytes / seconds / 2**30:6.2f} GiB/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
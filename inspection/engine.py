@@ -0,0 +1,167 @@
+# เครื่องมือวิเคราะห์เสียงเคาะ (ไม่มีส่วน UI) ใช้ร่วมกันทั้งหน้า Steel และ Brick
+import io
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from .metrics import timed
+
+COARSE_FRAME = 1024
+# เฟรมไม่เติมศูนย์ (แทบเป็น rectangular): ไซน์ที่อยู่กึ่งกลางระหว่าง bin ถูกวัดต่ำลงเหลือ sinc(1/2) ~ 0.637
+BOUND_MARGIN = 1 / np.sinc(0.5) + 0.01
+
+GOOD = "Good"
+DEFECTIVE = "Defective"
+TOO_LOUD = "Amplitude too high"
+
+
+@dataclass
+class InspectionResult:
+    peak_freq: float
+    peak_amp: float
+    result: str
+    frequencies: np.ndarray
+    magnitudes: np.ndarray
+
+
+# window และแกนความถี่ cache ไว้ตามความยาวสัญญาณ (และ sample rate)
+@lru_cache(maxsize=32)
+def hamming_window(n, dtype=np.float64):
+    w = np.hamming(n).astype(dtype)
+    w.flags.writeable = False
+    return w
+
+
+@lru_cache(maxsize=32)
+def rfft_frequencies(n, sr):
+    f = np.fft.rfftfreq(n, d=1 / sr)[: n // 2]
+    f.flags.writeable = False
+    return f
+
+
+def classify(peak_freq, peak_amp, profile):
+    if peak_amp > profile.max_amplitude:
+        return TOO_LOUD
+    if not (profile.freq_low <= peak_freq <= profile.freq_high):
+        return DEFECTIVE
+    return GOOD
+
+
+def first_channel(y):
+    return y[:, 0] if y.ndim > 1 else y
+
+
+# ค่าสูงสุดของ |y| โดยไม่สร้าง array |y| ชั่วคราว (และไม่ล้นกับ int16 ค่า -32768)
+def peak_abs(y):
+    return max(float(np.max(y)), -float(np.min(y)))
+
+
+# รับ array ชนิดใดก็ได้ (เช่น int16 ที่ยังเป็น view ของไฟล์) แปลงชนิดและหารในรอบเดียว
+# สัญญาณเงียบทั้งไฟล์ไม่หารด้วยศูนย์ (ปกติถูก inspection.quality ตีกลับก่อนถึงตรงนี้)
+def normalize(y, dtype=np.float64):
+    with timed("window") as span:
+        y = np.divide(y, peak_abs(y) or 1.0, dtype=dtype)
+        span.add(y)
+    return y
+
+
+def windowed_rfft(y, sr):
+    n = len(y)
+    with timed("window") as span:
+        y = y * hamming_window(n, y.dtype)
+        span.add(y)
+
+    # rfft ให้เฉพาะครึ่งบวกของสเปกตรัม ไม่ต้องคำนวณแล้วทิ้งครึ่งหนึ่ง
+    with timed("fft") as span:
+        Y = np.fft.rfft(y)
+        magnitudes = np.abs(Y[: n // 2])
+        span.add(Y, magnitudes)
+    return rfft_frequencies(n, sr), magnitudes
+
+
+def pick_peak(frequencies, magnitudes):
+    with timed("peak"):
+        peak_idx = np.argmax(magnitudes)
+        return float(frequencies[peak_idx]), float(magnitudes[peak_idx])
+
+
+# ขอบบนของ |X(f)| ในและนอกช่วง [lo, hi] จากเฟรมสั้น: |X(f)| <= sum_k |F_k(f)| (อสมการสามเหลี่ยม)
+# F_k คือ DFT ของเฟรมที่คูณด้วย Hamming ยาวทั้งไฟล์ช่วงเดียวกันแล้ว จึงแม่นทุกความถี่ในส่วนนี้
+# แต่ |F_k| รู้ค่าเฉพาะที่ bin: ยอดระหว่าง bin เผื่อด้วย BOUND_MARGIN (พอสำหรับไซน์เดี่ยว ไม่ใช่ขอบบนเคร่งครัด
+# สำหรับสัญญาณทุกแบบ) ผู้เรียกจึงต้องมีทางคำนวณ FFT ทั้งไฟล์สำรองเมื่อยืนยันไม่ได้
+# FFT สั้นไม่เติมศูนย์ทุกเฟรมราว 1/5 ของเวลา FFT ทั้งไฟล์ และ likely_outside() ใช้แค่ทุก PREDICT_STEP เฟรม
+# (อีกราว 1/4 ของนั้น) ทายก่อนว่ายอดสูงสุดน่าจะอยู่นอกช่วงหรือไม่ เฟรมที่คำนวณแล้วนับรวมใน bounds()
+class BandBound:
+    PREDICT_STEP = 4
+
+    def __init__(self, y, sr, lo, hi, frame=COARSE_FRAME):
+        n = len(y)
+        m = n // frame * frame
+        self.rows = y[:m].reshape(-1, frame)
+        self.window = hamming_window(n, np.dtype(np.float32))[:m].reshape(-1, frame)
+        f = np.fft.rfftfreq(frame, d=1 / sr)
+        self.inside = (f >= lo) & (f <= hi)
+        self.tail = float(np.sum(np.abs(y[m:].astype(np.float64))))  # ตัวอย่างท้ายที่ไม่ครบเฟรม (w <= 1)
+        self._sums = {}  # เฟสของเฟรม -> ผลรวม |F_k| ของเฟรมในเฟสนั้น
+
+    def _sum(self, phase):
+        if phase not in self._sums:
+            step = self.PREDICT_STEP
+            frames = np.multiply(self.rows[phase::step], self.window[phase::step], dtype=np.float32)
+            self._sums[phase] = np.abs(np.fft.rfft(frames, axis=1)).sum(axis=0)
+        return self._sums[phase]
+
+    @staticmethod
+    def _split(bound, inside):
+        return float(np.max(bound[inside], initial=0.0)), float(np.max(bound[~inside], initial=0.0))
+
+    # ทายจากเฟรมส่วนหนึ่ง (ไม่ใช่ขอบบน): ขอบบนนอกช่วงถึงขอบบนในช่วง = ต้องใช้ FFT ทั้งไฟล์แน่
+    def likely_outside(self):
+        if not len(self.rows):
+            return True
+        inside, outside = self._split(self._sum(0), self.inside)
+        return outside >= inside
+
+    # (ขอบบนในช่วง, ขอบบนนอกช่วง) ในหน่วยเดียวกับ y (ยังไม่ normalize)
+    def bounds(self):
+        if not len(self.rows):
+            return np.inf, np.inf
+        bound = sum(self._sum(phase) for phase in range(self.PREDICT_STEP))
+        inside, outside = self._split(bound, self.inside)
+        return inside * BOUND_MARGIN + self.tail, outside * BOUND_MARGIN + self.tail
+
+
+def spectrum(y, sr, dtype=np.float64):
+    return windowed_rfft(normalize(y, dtype), sr)
+
+
+def analyze(y, sr, profile, dtype=np.float64):
+    frequencies, magnitudes = spectrum(first_channel(y), sr, dtype)
+    peak_freq, peak_amp = pick_peak(frequencies, magnitudes)
+
+    return InspectionResult(
+        peak_freq=peak_freq,
+        peak_amp=peak_amp,
+        result=classify(peak_freq, peak_amp, profile),
+        frequencies=frequencies,
+        magnitudes=magnitudes,
+    )
+
+
+# WAV แบบ PCM/float อ่านเป็น view ตรงจาก buffer หรือ mmap (ชนิดเดิมของไฟล์ ไม่ scale)
+# รูปแบบอื่นใช้ soundfile (float64 ในช่วง [-1, 1]) ขั้นตอนถัดไป normalize ด้วยค่าสูงสุดทั้งคู่
+def load_audio(source):
+    from . import wav
+
+    with timed("decode") as span:
+        fast = wav.read(source)
+        if fast is not None:
+            return fast
+        import soundfile as sf
+
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        y, sr = sf.read(source)
+        span.add(y)
+    return first_channel(y), sr
@@ -0,0 +1,78 @@
+# สร้างไฟล์ Excel/CSV จากผลการทดสอบในฐานข้อมูล เมื่อมีการขอดาวน์โหลดเท่านั้น
+# เขียนทีละแถว (openpyxl write-only / csv) หน่วยความจำจึงไม่โตตามจำนวนแถว
+#
+#   python -m inspection.export --material steel --start 2025-01-01 --end 2025-01-31 --out steel.csv
+import argparse
+import csv
+import io
+import sys
+import tempfile
+
+from .store import COLUMNS, DEFAULT_DB, ResultStore
+
+FORMATS = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def write_csv(rows, fp):
+    text = io.TextIOWrapper(fp, encoding="utf-8-sig", newline="", write_through=True)
+    try:
+        writer = csv.writer(text)
+        writer.writerow(COLUMNS)
+        writer.writerows(rows)
+    finally:
+        text.detach()
+
+
+def write_xlsx(rows, fp):
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Results")
+    ws.append(COLUMNS)
+    for row in rows:
+        ws.append(row)
+    wb.save(fp)
+
+
+def export(store, material, fmt="xlsx", fp=None, start=None, end=None, result=None):
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown export format {fmt!r}, expected one of {sorted(FORMATS)}")
+    # ไฟล์ขนาดเล็กอยู่ในหน่วยความจำ ใหญ่กว่านั้นจะถูกเขียนลงดิสก์อัตโนมัติ
+    fp = fp or tempfile.SpooledTemporaryFile(max_size=8 * 2**20)
+    rows = store.iter_query(material, start, end, result)
+    (write_csv if fmt == "csv" else write_xlsx)(rows, fp)
+    fp.seek(0)
+    return fp
+
+
+def file_name(material, fmt, start=None, end=None):
+    span = f"_{start}_{end}" if start else ""
+    return f"test_results_{material}{span}.{fmt}"
+
+
+def main(argv=None):
+    from .profiles import PROFILES
+
+    parser = argparse.ArgumentParser(prog="python -m inspection.export", description="Export stored inspection results.")
+    parser.add_argument("--db", default=DEFAULT_DB)
+    parser.add_argument("--material", choices=sorted(PROFILES), required=True)
+    parser.add_argument("--start", help="first day (YYYY-MM-DD)")
+    parser.add_argument("--end", help="last day, inclusive (YYYY-MM-DD)")
+    parser.add_argument("--result", help="only rows with this verdict")
+    parser.add_argument("--out", required=True, help="output file (.csv or .xlsx)")
+    args = parser.parse_args(argv)
+
+    fmt = args.out.rsplit(".", 1)[-1].lower()
+    if fmt not in FORMATS:
+        parser.error("--out must end in .csv or .xlsx")
+    with open(args.out, "wb") as fp:
+        export(ResultStore(args.db), args.material, fmt, fp, args.start, args.end or args.start, args.result)
+    print(f"-> {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+# ดัชนีคุณลักษณะ (feature index) ของไฟล์เสียงทั้งคลัง เก็บเป็นไฟล์ .npy แยกคอลัมน์
+# โหลดแบบ memory-map ได้ในไม่กี่มิลลิวินาที และอัปเดตเฉพาะไฟล์ที่เพิ่ม/เปลี่ยน
+#
+#   python -m inspection.features Data                 # สร้าง/อัปเดต Data/.features
+#   python -m inspection.features Data --rebuild --workers 4
+#
+# ต่อไฟล์เก็บ: ยอด (ความถี่/แอมพลิจูด) ของ FFT ทั้งไฟล์ พลังงานในแถบความถี่แบบ log,
+# spectral centroid และสเปกตรัมย่อแบบ log-binned (ใช้เป็น fingerprint ได้)
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from .batch import DEFAULT_LABELS, expected_label, find_wavs, parse_labels
+from .engine import load_audio, pick_peak, spectrum
+
+VERSION = 1
+INDEX_DIR = ".features"  # ค่าเริ่มต้น: โฟลเดอร์ย่อยในโฟลเดอร์คลังเสียง
+MANIFEST = "manifest.json"
+
+# แถบพลังงาน (log-spaced) และ bin ของสเปกตรัมย่อ
+BAND_EDGES = np.geomspace(50, 24000, 25)
+SPECTRUM_EDGES = np.geomspace(50, 20000, 257)
+
+# คอลัมน์ -> (dtype, จำนวนค่าต่อไฟล์)
+COLUMNS = {
+    "peak_freq": (np.float64, 1),
+    "peak_amp": (np.float64, 1),
+    "centroid": (np.float32, 1),
+    "sample_rate": (np.int32, 1),
+    "duration": (np.float32, 1),
+    "band_energy": (np.float32, len(BAND_EDGES) - 1),
+    "spectrum": (np.float32, len(SPECTRUM_EDGES) - 1),
+}
+
+
+def _params():
+    return {"version": VERSION, "band_edges": BAND_EDGES.tolist(), "spectrum_edges": SPECTRUM_EDGES.tolist()}
+
+
+# ค่าเฉลี่ยของ values ในแต่ละช่วง edges (ช่วงที่ไม่มี bin เลยใช้ค่าประมาณที่กึ่งกลาง)
+def binned_mean(frequencies, values, edges):
+    idx = np.searchsorted(frequencies, edges)
+    c = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+    counts = np.diff(idx)
+    means = (c[idx[1:]] - c[idx[:-1]]) / np.maximum(counts, 1)
+    empty = counts == 0
+    if empty.any():
+        centers = np.sqrt(edges[:-1] * edges[1:])[empty]
+        means[empty] = np.interp(centers, frequencies, values, right=0.0)
+    return means
+
+
+def features_from_spectrum(frequencies, magnitudes):
+    power = magnitudes.astype(np.float64) ** 2
+    peak_freq, peak_amp = pick_peak(frequencies, magnitudes)
+    total = power.sum()
+    idx = np.searchsorted(frequencies, BAND_EDGES)
+    c = np.concatenate(([0.0], np.cumsum(power)))
+    return {
+        "peak_freq": peak_freq,
+        "peak_amp": peak_amp,
+        "centroid": float(frequencies @ power / total) if total else 0.0,
+        "band_energy": c[idx[1:]] - c[idx[:-1]],
+        "spectrum": binned_mean(frequencies, magnitudes, SPECTRUM_EDGES),
+    }
+
+
+def features_from_audio(y, sr):
+    row = features_from_spectrum(*spectrum(y, sr))
+    row["sample_rate"] = sr
+    row["duration"] = len(y) / sr
+    return row
+
+
+def extract_file(path):
+    try:
+        y, sr = load_audio(path)
+        return features_from_audio(y, sr), ""
+    except Exception as e:  # ไฟล์เสียหาย/อ่านไม่ได้ ข้ามไป ไม่ให้ทั้งดัชนีล้ม
+        return None, str(e)
+
+
+def _extract_chunk(paths):
+    return [extract_file(p) for p in paths]
+
+
+def extract_many(paths, workers=None, chunksize=8):
+    workers = workers or os.cpu_count() or 1
+    chunks = [paths[i:i + chunksize] for i in range(0, len(paths), chunksize)]
+    if workers == 1 or len(chunks) <= 1:
+        return [r for chunk in map(_extract_chunk, chunks) for r in chunk]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [r for chunk in pool.map(_extract_chunk, chunks) for r in chunk]
+
+
+@dataclass
+class FeatureIndex:
+    directory: str
+    root: str
+    entries: list  # [{"path", "size", "mtime_ns"}] path สัมพัทธ์กับ root
+    columns: dict  # ชื่อ -> array แถวละไฟล์ (memory-mapped เมื่อโหลดจากดิสก์)
+    generation: int = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    @property
+    def paths(self):
+        return [os.path.join(self.root, e["path"]) for e in self.entries]
+
+    # ผลที่คาดหวังจากชื่อโฟลเดอร์ (เหมือน inspection.batch)
+    def labels(self, labels=DEFAULT_LABELS):
+        return np.array([expected_label(p, labels) for p in self.paths])
+
+
+def default_directory(root):
+    return os.path.join(root, INDEX_DIR)
+
+
+def load_index(root, directory=None, mmap=True):
+    directory = directory or default_directory(root)
+    with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest["params"] != _params():
+        raise ValueError(f"feature index {directory} was built with different parameters; rebuild it")
+    gen = manifest["generation"]
+    columns = {
+        name: np.load(os.path.join(directory, f"{name}.{gen}.npy"), mmap_mode="r" if mmap else None)
+        for name in COLUMNS
+    }
+    return FeatureIndex(directory, root, manifest["entries"], columns, gen)
+
+
+def _empty_columns(n):
+    return {name: np.zeros((n, width) if width > 1 else n, dtype) for name, (dtype, width) in COLUMNS.items()}
+
+
+def _save(directory, root, entries, columns, previous_generation):
+    os.makedirs(directory, exist_ok=True)
+    gen = previous_generation + 1
+    for name, values in columns.items():
+        np.save(os.path.join(directory, f"{name}.{gen}.npy"), values)
+
+    # manifest เขียนทีหลังสุดแบบ atomic ผู้อ่านจึงเห็นชุดเก่าหรือชุดใหม่ทั้งชุดเสมอ
+    manifest = {"params": _params(), "generation": gen, "entries": entries}
+    tmp = os.path.join(directory, f"{MANIFEST}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, os.path.join(directory, MANIFEST))
+
+    for name in os.listdir(directory):
+        parts = name.split(".")
+        if name.endswith(".npy") and len(parts) == 3 and parts[1] != str(gen):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass  # อาจถูก process อื่น memory-map อยู่ (Windows)
+    return gen
+
+
+# สแกน root แล้วคำนวณเฉพาะไฟล์ใหม่หรือที่ขนาด/mtime เปลี่ยน คืน (index, สถิติ)
+def update_index(root, directory=None, workers=None, rebuild=False):
+    directory = directory or default_directory(root)
+    old = None
+    if not rebuild:
+        try:
+            old = load_index(root, directory)
+        except (OSError, ValueError, KeyError):
+            old = None
+    known = {e["path"]: (i, e) for i, e in enumerate(old.entries)} if old else {}
+
+    scanned = []
+    for path in find_wavs(root):
+        if os.path.abspath(path).startswith(os.path.abspath(directory) + os.sep):
+            continue
+        st = os.stat(path)
+        scanned.append({"path": os.path.relpath(path, root), "size": st.st_size, "mtime_ns": st.st_mtime_ns})
+
+    keep, todo = [], []
+    for e in scanned:
+        i, prev = known.get(e["path"], (None, None))
+        if prev is not None and prev["size"] == e["size"] and prev["mtime_ns"] == e["mtime_ns"]:
+            keep.append((e, i))
+        else:
+            todo.append(e)
+
+    results = extract_many([os.path.join(root, e["path"]) for e in todo], workers)
+    errors = {e["path"]: err for e, (row, err) in zip(todo, results) if row is None}
+    added = [(e, row) for e, (row, _) in zip(todo, results) if row is not None]
+
+    entries = [e for e, _ in keep] + [e for e, _ in added]
+    order = sorted(range(len(entries)), key=lambda k: entries[k]["path"])
+    columns = _empty_columns(len(entries))
+    if keep:
+        rows = np.array([i for _, i in keep])
+        for name in COLUMNS:
+            columns[name][: len(keep)] = old.columns[name][rows]
+    for k, (_, row) in enumerate(added, start=len(keep)):
+        for name in COLUMNS:
+            columns[name][k] = row[name]
+    entries = [entries[k] for k in order]
+    columns = {name: values[order] for name, values in columns.items()}
+
+    stats = {
+        "new": sum(1 for e, _ in added if e["path"] not in known),
+        "changed": sum(1 for e, _ in added if e["path"] in known),
+        "unchanged": len(keep),
+        "removed": len(set(known) - {e["path"] for e in scanned}),
+        "errors": errors,
+    }
+    if todo or stats["removed"] or old is None:
+        _save(directory, root, entries, columns, old.generation if old else 0)
+    return load_index(root, directory), stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m inspection.features", description="Build or update the per-recording feature index.")
+    parser.add_argument("root", help="directory of recordings to index")
+    parser.add_argument("--index", default=None, help=f"index directory (default: ROOT/{INDEX_DIR})")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the existing index and extract every file")
+    parser.add_argument("--label", action="append", metavar="FOLDER=LABEL", help="map a folder name to an expected verdict")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    index, stats = update_index(args.root, args.index, args.workers, args.rebuild)
+    elapsed = time.perf_counter() - t0
+    for path, err in stats["errors"].items():
+        print(f"skipped {path}: {err}", file=sys.stderr)
+    print(
+        f"{len(index)} recordings indexed in {elapsed:.2f}s: {stats['new']} new, {stats['changed']} changed, "
+        f"{stats['unchanged']} unchanged, {stats['removed']} removed, {len(stats['errors'])} errors -> {index.directory}"
+    )
+
+    t0 = time.perf_counter()
+    index = load_index(args.root, args.index)
+    labels = index.labels(parse_labels(args.label))
+    elapsed = time.perf_counter() - t0
+    counts = ", ".join(f"{label or '(unlabelled)'}: {n}" for label, n in zip(*np.unique(labels, return_counts=True)))
+    print(f"load: {elapsed * 1000:.1f} ms ({counts})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+# เทียบลายเสียง (spectral fingerprint) กับตัวอย่างที่รู้ผลแบบ k-nearest-neighbour
+#
+#   python -m inspection.fingerprint Data               # ประเมินแบบ leave-one-out เทียบกับกฎยอดความถี่
+#   python -m inspection.fingerprint Data --scale 50000 # เวลาค้นหาเมื่อมีตัวอย่าง 50,000 รายการ
+#
+# fingerprint = log ของสเปกตรัมย่อแบบ log-binned (จาก feature index) ลบค่าเฉลี่ยแล้วทำ norm = 1
+# ความคล้าย = cosine similarity = dot product กับเมทริกซ์ float32 ต่อเนื่องในหน่วยความจำแถวละตัวอย่าง
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from .batch import DEFAULT_LABELS, parse_labels
+from .engine import DEFECTIVE, GOOD, spectrum
+from .features import SPECTRUM_EDGES, binned_mean, load_index, update_index
+
+K = 5
+FLOOR = 1e-6  # ค่าต่ำสุดก่อน log (สเปกตรัม normalize แล้ว ยอด ~ 1e2–1e3)
+
+
+def fingerprint(spectra):
+    x = np.log10(np.maximum(np.asarray(spectra, dtype=np.float32), FLOOR))
+    x -= x.mean(axis=-1, keepdims=True)
+    x /= np.maximum(np.linalg.norm(x, axis=-1, keepdims=True), 1e-12)
+    return np.ascontiguousarray(x, dtype=np.float32)
+
+
+def audio_fingerprint(y, sr):
+    frequencies, magnitudes = spectrum(y, sr, np.float32)
+    return fingerprint(binned_mean(frequencies, magnitudes, SPECTRUM_EDGES))
+
+
+@dataclass
+class Match:
+    result: str
+    similarity: float  # ความคล้ายเฉลี่ยของเพื่อนบ้านที่ได้ผลเดียวกัน
+    votes: dict  # ผล -> ผลรวมความคล้าย
+    neighbours: list  # [(path, label, similarity)] เรียงจากคล้ายมากไปน้อย
+
+
+class FingerprintIndex:
+    def __init__(self, matrix, labels, paths):
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self.labels = np.asarray(labels)
+        self.paths = list(paths)
+
+    def __len__(self):
+        return len(self.labels)
+
+    # จากคลังที่รู้ผล (ไฟล์ในโฟลเดอร์ที่ไม่มีใน labels จะไม่ถูกใช้)
+    @classmethod
+    def from_features(cls, index, labels=DEFAULT_LABELS):
+        expected = index.labels(labels)
+        keep = np.flatnonzero(expected != "")
+        paths = index.paths
+        return cls(fingerprint(np.asarray(index["spectrum"])[keep]), expected[keep], [paths[i] for i in keep])
+
+    # ค้นหาหลาย query พร้อมกัน: (q, d) -> (ตำแหน่ง, ความคล้าย) ขนาด (q, k) เรียงมากไปน้อย
+    def search(self, queries, k=K, exclude=None):
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        similarity = queries @ self.matrix.T
+        if exclude is not None:
+            similarity[np.arange(len(queries)), exclude] = -np.inf  # leave-one-out
+        k = min(k, similarity.shape[1])
+        top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        sims = np.take_along_axis(similarity, top, axis=1)
+        order = np.argsort(-sims, axis=1)
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(sims, order, axis=1)
+
+    def vote(self, rows, sims):
+        votes = {}
+        for label, s in zip(self.labels[rows], sims):
+            votes[label] = votes.get(label, 0.0) + max(float(s), 0.0)
+        # คะแนนเท่ากันตัดสินเป็น Defective (เหมือนการรวมผลรายครั้งที่เคาะ)
+        result = max(votes, key=lambda label: (votes[label], label == DEFECTIVE))
+        same = [float(s) for label, s in zip(self.labels[rows], sims) if label == result]
+        neighbours = [(self.paths[i], self.labels[i], float(s)) for i, s in zip(rows, sims)]
+        return Match(result, sum(same) / len(same), votes, neighbours)
+
+    def classify(self, query, k=K):
+        rows, sims = self.search(query, k)
+        return self.vote(rows[0], sims[0])
+
+
+# build=False อ่านดัชนีที่สร้างไว้แล้วเท่านั้น (ไม่สแกนโฟลเดอร์ ไม่เขียนไฟล์) สำหรับหน้าเว็บ
+# ยังไม่มีดัชนีหรือสร้างด้วยค่าตั้งอื่น: OSError / ValueError / KeyError (สร้างด้วย python -m inspection.features)
+def load_reference(root, labels=DEFAULT_LABELS, build=False):
+    index = update_index(root)[0] if build else load_index(root)
+    return FingerprintIndex.from_features(index, labels)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m inspection.fingerprint", description="Evaluate k-nearest-neighbour fingerprint matching on labelled recordings.")
+    parser.add_argument("root", help="directory with labelled recording folders")
+    parser.add_argument("-k", type=int, default=K)
+    parser.add_argument("--label", action="append", metavar="FOLDER=LABEL", help="map a folder name to an expected verdict")
+    parser.add_argument("--material", default="steel", help="profile for the peak-rule comparison")
+    parser.add_argument("--scale", type=int, default=0, help="also time single queries against N reference rows (tiled)")
+    args = parser.parse_args(argv)
+
+    from .engine import classify
+    from .profiles import get_profile
+
+    labels = parse_labels(args.label)
+    index, _ = update_index(args.root)
+    ref = FingerprintIndex.from_features(index, labels)
+    if not len(ref):
+        print(f"no labelled recordings under {args.root}", file=sys.stderr)
+        return 1
+
+    # leave-one-out: ทุกไฟล์ค้นหาในคลังที่เหลือ (query ทั้งหมดใน matmul เดียว)
+    t0 = time.perf_counter()
+    rows, sims = ref.search(ref.matrix, args.k, exclude=np.arange(len(ref)))
+    knn = np.array([ref.vote(r, s).result for r, s in zip(rows, sims)])
+    elapsed = time.perf_counter() - t0
+
+    profile = get_profile(args.material)
+    expected = index.labels(labels)
+    known = expected != ""
+    peak = np.array([classify(f, a, profile) for f, a in zip(np.asarray(index["peak_freq"])[known], np.asarray(index["peak_amp"])[known])])
+    print(f"{len(ref)} reference recordings, k={args.k}, {ref.matrix.shape[1]} bins, leave-one-out in {elapsed * 1000:.1f} ms")
+    print(f"kNN fingerprint accuracy: {np.mean(knn == ref.labels):.1%}")
+    print(f"peak rule accuracy:       {np.mean(peak == ref.labels):.1%}")
+    for label in (GOOD, DEFECTIVE):
+        m = ref.labels == label
+        if m.any():
+            print(f"  {label:<10} kNN {np.mean(knn[m] == label):.1%}  peak {np.mean(peak[m] == label):.1%}")
+
+    if args.scale:
+        big = FingerprintIndex(np.resize(ref.matrix, (args.scale, ref.matrix.shape[1])), np.resize(ref.labels, args.scale), ref.paths * (args.scale // len(ref) + 1))
+        q = ref.matrix[0]
+        times = []
+        for _ in range(20):
+            t0 = time.perf_counter()
+            big.classify(q, args.k)
+            times.append(time.perf_counter() - t0)
+        print(f"single query against {args.scale} rows ({big.matrix.nbytes / 2**20:.1f} MiB): median {np.median(times) * 1000:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+# เลือกวิธีวิเคราะห์ตามชื่อ ใช้ร่วมกันระหว่างหน้าเว็บและ HTTP service (ไม่ต้องมี Streamlit)
+import io
+
+STREAMING_BYTES = 50 * 2**20  # ไฟล์ใหญ่กว่านี้ใช้การวิเคราะห์แบบ streaming
+METHODS = ["full", "taps", "zoom"]
+
+
+# วิธีที่ใช้จริง: ไฟล์ใหญ่กว่า STREAMING_BYTES ใช้ "stream" เสมอ (taps/zoom ต้องอ่านทั้งไฟล์เข้าหน่วยความจำ)
+def used_method(size, method):
+    return "stream" if size > STREAMING_BYTES else method
+
+
+# ฟังก์ชันวิเคราะห์เสียง (ไฟล์ใหญ่อ่านทีละช่วง หน่วยความจำไม่โตตามความยาวไฟล์)
+# source เป็น bytes ของไฟล์ได้โดยตรง (WAV อ่านเป็น view ไม่คัดลอก) หรือ path / file-like
+# เสียงที่ใช้ไม่ได้ (เงียบ/clip/SNR ต่ำ) หยุดก่อนงานสเปกตรัมด้วย inspection.quality.RejectedCapture
+def analyze_audio(source, size, profile, method="full"):
+    from .engine import load_audio
+    from .quality import gate, gate_source
+
+    if method not in METHODS:
+        raise ValueError(f"unknown method {method!r}, expected one of {METHODS}")
+    if used_method(size, method) == "stream":
+        from .streaming import analyze_stream
+
+        gate_source(source)
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        return analyze_stream(source, profile)
+    y, sr = load_audio(source)
+    gate(y)
+    return analyze_samples(y, sr, profile, method)
+
+
+# วิเคราะห์ตัวอย่างเสียงที่ถอดรหัสและผ่านการตรวจคุณภาพแล้ว ด้วยวิธีที่เลือก
+def analyze_samples(y, sr, profile, method="full"):
+    if method == "taps":
+        from .taps import analyze_taps
+
+        return analyze_taps(y, sr, profile)
+    if method == "zoom":
+        from .zoom import analyze_zoom
+
+        return analyze_zoom(y, sr, profile)
+    # ลด sample rate ให้พอดีกับแถบความถี่ของวัสดุก่อน FFT (ยอดนอก passband ตรวจด้วยขอบบน)
+    from .resample import analyze_decimated
+
+    return analyze_decimated(y, sr, profile, verify_full_band=True)
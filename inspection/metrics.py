@@ -0,0 +1,306 @@
+# จับเวลาและขนาดหน่วยความจำของแต่ละขั้นตอนในการตรวจหนึ่งครั้ง
+#
+#   python -m inspection.metrics                     # สรุป p50/p95/p99 จาก log เป็นตาราง
+#   python -m inspection.metrics --prometheus        # ข้อความแบบ Prometheus (ให้ scraper อ่าน)
+#   python -m inspection.metrics --prometheus --out /var/lib/node_exporter/inspection.prom
+#
+# with inspection(material): ... เริ่มเก็บของการตรวจหนึ่งครั้ง และ with timed(stage) ในโค้ดวิเคราะห์
+# บันทึกเวลาเข้าไปที่การตรวจนั้น (นอก inspection() แทบไม่มีค่าใช้จ่าย) เมื่อจบจะเข้าสถิติแบบ rolling
+# ของ process และต่อท้ายหนึ่งบรรทัด JSON ใน log (INSPECTION_METRICS_LOG ตั้งเป็นค่าว่าง = ไม่เขียน)
+# ขนาดหน่วยความจำ = ขนาด array ที่ขั้นตอนนั้นสร้าง หรือ peak จาก tracemalloc ถ้าเปิดไว้
+# (PYTHONTRACEMALLOC=1 วัดได้ครบกว่าแต่ช้าลง และรวมงานของ thread อื่นที่รันพร้อมกันด้วย)
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+STAGES = ["read", "decode", "gate", "window", "fft", "peak", "match", "persist", "plot", "history"]
+STAGE_LABELS = {
+    "read": "อ่านไฟล์ที่อัปโหลด",
+    "decode": "ถอดรหัสเสียง",
+    "gate": "ตรวจคุณภาพเสียง",
+    "window": "normalize / window / ลด sample rate",
+    "fft": "FFT",
+    "peak": "หายอด",
+    "match": "เทียบลายเสียง",
+    "persist": "บันทึกผล",
+    "plot": "วาดกราฟ",
+    "history": "โหลดผลก่อนหน้า",
+}
+QUANTILES = (0.5, 0.95, 0.99)
+WINDOW = 1024  # จำนวนครั้งล่าสุดต่อ (ขั้นตอน, วัสดุ) ที่ใช้คำนวณ percentile
+RECENT = 20
+LOG_FILE = os.environ.get("INSPECTION_METRICS_LOG", "inspection_metrics.jsonl")
+LOG_MAX_BYTES = 16 * 2**20  # ใหญ่กว่านี้ย้ายไปเป็น <log>.1 แล้วเริ่มไฟล์ใหม่
+
+_current = ContextVar("inspection_trace", default=None)
+
+
+class Trace:
+    def __init__(self, material, **labels):
+        self.material = material
+        self.labels = labels
+        self.started = time.time()
+        self.stages = {}  # ขั้นตอน -> [วินาที, ไบต์] (เรียกซ้ำในขั้นตอนเดียวกันรวมกัน)
+
+    def add(self, stage, seconds, nbytes=0):
+        entry = self.stages.setdefault(stage, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += nbytes
+
+    # รวมขั้นตอนที่วัดใน worker อื่น (เช่น process pool ของ HTTP service)
+    def merge(self, stages):
+        for stage, (seconds, nbytes) in stages.items():
+            self.add(stage, seconds, nbytes)
+
+    @property
+    def total(self):
+        return sum(seconds for seconds, _ in self.stages.values())
+
+    def as_dict(self):
+        return {
+            "time": round(self.started, 3),
+            "material": self.material,
+            **self.labels,
+            "stages": {stage: {"seconds": round(s, 6), "bytes": b} for stage, (s, b) in self.stages.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        d = dict(d)
+        stages = d.pop("stages", {})
+        material = d.pop("material", "")
+        started = d.pop("time", 0.0)
+        trace = cls(material, **d)
+        trace.started = started
+        for stage, v in stages.items():
+            trace.add(stage, v["seconds"], v.get("bytes", 0))
+        return trace
+
+
+class Span:
+    __slots__ = ("bytes",)
+
+    def __init__(self):
+        self.bytes = 0
+
+    # บอกขนาดผลลัพธ์ของขั้นตอน (array ที่สร้างขึ้นใหม่)
+    def add(self, *arrays):
+        self.bytes += sum(a.nbytes if hasattr(a, "nbytes") else len(a) for a in arrays)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def add(self, *arrays):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def current():
+    return _current.get()
+
+
+@contextmanager
+def capture(trace):
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timed(stage):
+    trace = _current.get()
+    if trace is None:
+        yield _NULL_SPAN
+        return
+    span = Span()
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+    t0 = time.perf_counter()
+    try:
+        yield span
+    finally:
+        elapsed = time.perf_counter() - t0
+        nbytes = max(tracemalloc.get_traced_memory()[1] - base, 0) if tracing else span.bytes
+        trace.add(stage, elapsed, nbytes)
+
+
+# การตรวจหนึ่งครั้ง (หรือหนึ่งการกระทำ เช่นโหลดตารางผล) จบแล้วเข้าสถิติและ log
+@contextmanager
+def inspection(material, **labels):
+    trace = Trace(material, **labels)
+    try:
+        with capture(trace):
+            yield trace
+    finally:
+        if trace.stages:
+            REGISTRY.observe(trace)
+            write_log(trace)
+
+
+def quantile(ordered, q):
+    # interpolation แบบเดียวกับ numpy.percentile (linear)
+    if not ordered:
+        return float("nan")
+    pos = (len(ordered) - 1) * q
+    i = int(pos)
+    j = min(i + 1, len(ordered) - 1)
+    return ordered[i] + (ordered[j] - ordered[i]) * (pos - i)
+
+
+def _stage_order(stage):
+    return STAGES.index(stage) if stage in STAGES else len(STAGES)
+
+
+class Registry:
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {}  # (ขั้นตอน, วัสดุ) -> deque ของ (วินาที, ไบต์) ล่าสุด
+        self._totals = {}  # (ขั้นตอน, วัสดุ) -> [จำนวน, วินาทีรวม, ไบต์รวม] ตั้งแต่เริ่ม process
+        self.recent = deque(maxlen=RECENT)
+
+    def observe(self, trace):
+        with self._lock:
+            for stage, (seconds, nbytes) in trace.stages.items():
+                key = (stage, trace.material)
+                samples = self._samples.get(key)
+                if samples is None:
+                    samples = self._samples[key] = deque(maxlen=self.window)
+                    self._totals[key] = [0, 0.0, 0]
+                samples.append((seconds, nbytes))
+                totals = self._totals[key]
+                totals[0] += 1
+                totals[1] += seconds
+                totals[2] += nbytes
+            self.recent.append(trace)
+
+    # หนึ่งแถวต่อ (ขั้นตอน, วัสดุ) เรียงตามลำดับขั้นตอน
+    def summary(self, material=None):
+        with self._lock:
+            items = [(k, list(v), list(self._totals[k])) for k, v in self._samples.items() if material in (None, k[1])]
+        rows = []
+        for (stage, mat), samples, (count, seconds, nbytes) in sorted(items, key=lambda i: (_stage_order(i[0][0]), i[0])):
+            times = sorted(s for s, _ in samples)
+            sizes = sorted(b for _, b in samples)
+            rows.append({
+                "stage": stage,
+                "material": mat,
+                "count": count,
+                "seconds": seconds,
+                "bytes": nbytes,
+                "p50": quantile(times, 0.5),
+                "p95": quantile(times, 0.95),
+                "p99": quantile(times, 0.99),
+                "bytes_p50": quantile(sizes, 0.5),
+                "bytes_p95": quantile(sizes, 0.95),
+                "bytes_p99": quantile(sizes, 0.99),
+            })
+        return rows
+
+    # การตรวจล่าสุด (เก่าไปใหม่) ไม่เกิน RECENT ครั้ง
+    def traces(self, material=None):
+        with self._lock:
+            return [t for t in self.recent if material in (None, t.material)]
+
+    # text exposition format 0.0.4: summary ต่อ (ขั้นตอน, วัสดุ) quantile จาก WINDOW ครั้งล่าสุด
+    def prometheus(self):
+        rows = self.summary()
+        lines = []
+        for name, prefix, total, what in (
+            ("inspection_stage_seconds", "p", "seconds", "Wall time"),
+            ("inspection_stage_bytes", "bytes_p", "bytes", "Memory allocated"),
+        ):
+            lines += [
+                f"# HELP {name} {what} of one inspection stage (quantiles over the last {self.window} runs).",
+                f"# TYPE {name} summary",
+            ]
+            for row in rows:
+                labels = f'stage="{row["stage"]}",material="{row["material"]}"'
+                for q in QUANTILES:
+                    lines.append(f'{name}{{{labels},quantile="{q:g}"}} {row[f"{prefix}{round(q * 100)}"]:.9g}')
+                lines.append(f"{name}_sum{{{labels}}} {row[total]:.9g}")
+                lines.append(f"{name}_count{{{labels}}} {row['count']}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+_log_lock = threading.Lock()
+
+
+def write_log(trace, path=None):
+    path = LOG_FILE if path is None else path
+    if not path:
+        return
+    line = json.dumps(trace.as_dict(), ensure_ascii=False) + "\n"
+    try:
+        with _log_lock:
+            if os.path.exists(path) and os.path.getsize(path) > LOG_MAX_BYTES:
+                os.replace(path, path + ".1")
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line)
+    except OSError:
+        pass  # เขียน log ไม่ได้ไม่ควรทำให้การตรวจล้ม
+
+
+def read_log(path=LOG_FILE):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield Trace.from_dict(json.loads(line))
+
+
+def format_table(rows):
+    lines = [f"{'stage':<9}{'material':<10}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'p50 KiB':>10}"]
+    for r in rows:
+        lines.append(
+            f"{r['stage']:<9}{r['material']:<10}{r['count']:>7}"
+            f"{r['p50'] * 1000:>10.2f}{r['p95'] * 1000:>10.2f}{r['p99'] * 1000:>10.2f}{r['bytes_p50'] / 1024:>10.0f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m inspection.metrics", description="Summarise per-stage inspection timings from the metrics log.")
+    parser.add_argument("log", nargs="?", default=LOG_FILE or "inspection_metrics.jsonl")
+    parser.add_argument("--window", type=int, default=WINDOW, help="most recent runs per stage and material used for quantiles")
+    parser.add_argument("--material", default=None)
+    parser.add_argument("--prometheus", action="store_true", help="print the Prometheus text format instead of a table")
+    parser.add_argument("--out", default=None, help="write atomically to this file (for a textfile collector)")
+    args = parser.parse_args(argv)
+
+    registry = Registry(args.window)
+    try:
+        for trace in read_log(args.log):
+            if args.material in (None, trace.material):
+                registry.observe(trace)
+    except FileNotFoundError:
+        print(f"no metrics log at {args.log}", file=sys.stderr)
+        return 1
+
+    text = registry.prometheus() if args.prometheus else format_table(registry.summary()) + "\n"
+    if args.out:
+        tmp = f"{args.out}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, args.out)
+    else:
+        sys.stdout.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
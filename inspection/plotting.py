@@ -0,0 +1,81 @@
+# กราฟสเปกตรัมแบบเบา: ย่อข้อมูลเป็น min/max envelope ตามความกว้างจอ แล้ววาดฝั่ง browser (spec ของ Vega-Lite)
+import numpy as np
+
+SCREEN_POINTS = 1200
+
+
+# ย่อเหลือ min/max ต่อช่วง (bucket) ละ 2 จุด ยอดสูงสุดของสเปกตรัมจึงไม่หายไป
+def envelope(x, y, buckets=SCREEN_POINTS):
+    n = len(y)
+    if n <= 2 * buckets:
+        return np.asarray(x), np.asarray(y)
+    starts = np.linspace(0, n, buckets, endpoint=False).astype(np.intp)
+    lo = np.minimum.reduceat(y, starts)
+    hi = np.maximum.reduceat(y, starts)
+    ends = np.append(starts[1:], n)
+    centers = (x[starts] + x[ends - 1]) / 2
+    return np.repeat(centers, 2), np.column_stack([lo, hi]).ravel()
+
+
+# ช่วงความถี่รอบแถบที่ยอมรับ (ขยายออกข้างละ margin เท่าของความกว้างแถบ)
+def zoom_range(profile, margin=2.0):
+    width = profile.freq_high - profile.freq_low
+    return max(profile.freq_low - margin * width, 0.0), profile.freq_high + margin * width
+
+
+# สร้าง spec ของ Vega-Lite เป็น dict โดยตรง (ไม่ผ่าน altair: สร้าง Chart + to_dict ช้ากว่าการวาดจริงหลายเท่า)
+# ส่งให้ st.vega_lite_chart ได้ทันที ส่วนที่เปลี่ยนแต่ละครั้งมีแค่ข้อมูลเส้น ชื่อกราฟ และตำแหน่งยอด
+def _values(x, y):
+    # ปัดเศษก่อนส่งไป browser (ลดขนาด JSON ของกราฟ)
+    return [{"f": f, "m": m} for f, m in zip(np.round(x, 2).tolist(), np.round(y, 2).tolist())]
+
+
+def _band_view(name, x, y, peak_freq, profile, title, domain=None):
+    frequency = {"field": "f", "type": "quantitative", "title": "Frequency (Hz)"}
+    if domain:
+        frequency["scale"] = {"domain": [float(v) for v in domain]}
+    band = {
+        "data": {"values": [{"low": profile.freq_low, "high": profile.freq_high, "label": f"Good material ({profile.band_label})"}]},
+        "mark": {"type": "rect", "color": "green", "opacity": 0.3},
+        "encoding": {
+            "x": {"field": "low", "type": "quantitative"},
+            "x2": {"field": "high"},
+            "tooltip": [{"field": "label", "type": "nominal", "title": "Band"}],
+        },
+    }
+    line = {
+        "data": {"values": _values(x, y)},
+        "mark": {"type": "line", "strokeWidth": 1},
+        "encoding": {
+            "x": frequency,
+            "y": {"field": "m", "type": "quantitative", "title": "Magnitude"},
+            "tooltip": [
+                {"field": "f", "type": "quantitative", "title": "Frequency (Hz)"},
+                {"field": "m", "type": "quantitative", "title": "Magnitude"},
+            ],
+        },
+        # ซูม/เลื่อนแกนความถี่ได้ฝั่ง browser โดยไม่ต้อง rerun
+        "params": [{"name": name, "select": {"type": "interval", "encodings": ["x"]}, "bind": "scales"}],
+    }
+    peak = {
+        "data": {"values": [{"peak": float(peak_freq)}]},
+        "mark": {"type": "rule", "color": "red", "strokeDash": [4, 4]},
+        "encoding": {
+            "x": {"field": "peak", "type": "quantitative"},
+            "tooltip": [{"field": "peak", "type": "quantitative", "title": "Peak (Hz)", "format": ".2f"}],
+        },
+    }
+    return {"title": title, "height": 220, "layer": [band, line, peak]}
+
+
+def spectrum_chart(frequencies, magnitudes, peak_freq, profile, zoom=True, buckets=SCREEN_POINTS):
+    x, y = envelope(frequencies, magnitudes, buckets)
+    full = _band_view("full", x, y, peak_freq, profile, f"FFT Spectrum (Peak = {peak_freq:.2f} Hz)")
+    if not zoom:
+        return full
+
+    lo, hi = zoom_range(profile)
+    i, j = np.searchsorted(frequencies, [lo, hi])
+    zx, zy = envelope(frequencies[i:j], magnitudes[i:j], buckets)
+    detail = _band_view("zoom", zx, zy, peak_freq, profile, f"ช่วง {lo:g}–{hi:g} Hz", domain=(lo, hi))
+    return {"vconcat": [full, detail]}
@@ -0,0 +1,62 @@
+import json
+import os
+from dataclasses import dataclass, replace
+
+# ค่าที่ปรับได้จากไฟล์ config (เขียนโดย python -m inspection.calibrate)
+CONFIG_FILE = os.environ.get("INSPECTION_PROFILES", "profiles.json")
+TUNABLE = ("freq_low", "freq_high", "max_amplitude")
+
+
+# ค่าตรวจสอบของวัสดุแต่ละชนิด
+@dataclass(frozen=True)
+class MaterialProfile:
+    key: str
+    name: str
+    freq_low: float
+    freq_high: float
+    max_amplitude: float = 2000
+    excel_file: str = ""
+    reference_dir: str = ""  # โฟลเดอร์ตัวอย่างที่รู้ผล สำหรับเทียบลายเสียง (ว่าง = ไม่เทียบ)
+
+    @property
+    def band_label(self):
+        return f"{self.freq_low:g}–{self.freq_high:g} Hz"
+
+
+def load_config(path=CONFIG_FILE):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def configured(profile, config):
+    values = config.get(profile.key, {})
+    return replace(profile, **{k: float(values[k]) for k in TUNABLE if k in values})
+
+
+# บันทึกค่าใหม่ของวัสดุหนึ่งชนิดลงไฟล์ config (คงค่าของวัสดุอื่นไว้)
+def write_config(key, values, path=CONFIG_FILE):
+    config = load_config(path)
+    config[key] = {**config.get(key, {}), **{k: values[k] for k in TUNABLE if k in values}}
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+        f.write("\n")
+    os.replace(tmp, path)
+    return config
+
+
+_config = load_config()
+STEEL = configured(MaterialProfile("steel", "Steel", 8600, 8800, 2000, "test_results_Steel.xlsx", "Data"), _config)
+BRICK = configured(MaterialProfile("brick", "Brick", 376, 401, 2000, "test_results_Brick.xlsx"), _config)
+
+PROFILES = {p.key: p for p in (STEEL, BRICK)}
+
+
+def get_profile(key):
+    try:
+        return PROFILES[key.lower()]
+    except KeyError:
+        raise ValueError(f"unknown material {key!r}, expected one of {sorted(PROFILES)}") from None
@@ -0,0 +1,114 @@
+# ตรวจคุณภาพเสียงก่อนวิเคราะห์สเปกตรัม: เงียบ, clip, หรือยอดเคาะไม่เด่นจากเสียงรบกวน
+# ใช้เวลาไม่กี่มิลลิวินาที ไฟล์ที่ไม่ผ่านไม่ต้อง normalize/FFT/วาดกราฟ และไม่บันทึกเป็นผลตรวจ
+# (บันทึกเหตุผลแยกไว้ในตาราง rejections ของ inspection.store)
+#
+# คิดจากเฟรมละ FRAME ตัวอย่าง (ไม่มี FFT): RMS ต่อเฟรม และจำนวนตัวอย่างที่ชนเต็มสเกล
+# SNR = เฟรมที่ดังที่สุด (ช่วงเคาะ) เทียบกับระดับพื้น (percentile ที่ NOISE_PERCENTILE ของ RMS ต่อเฟรม)
+# สัญญาณยาวเกิน PREVIEW_SAMPLES ใช้เฉพาะเฟรมที่เว้นระยะเท่ากันตลอดไฟล์
+# ค่าเริ่มต้นเผื่อจากไฟล์ใน Data/ ทุกไฟล์: RMS >= -50 dBFS, SNR >= 49 dB, clip <= 0.02%
+from dataclasses import asdict, dataclass
+
+import numpy as np
+
+from . import wav
+from .metrics import timed
+
+FRAME = 1024
+PREVIEW_SAMPLES = 2**20
+FLOOR_DB = -120.0  # ค่าต่ำสุดที่รายงาน (สัญญาณเป็นศูนย์ทั้งหมด)
+SILENCE_DBFS = -70.0  # RMS ทั้งไฟล์ต่ำกว่านี้ถือว่าเงียบ
+CLIP_LEVEL = 0.999  # |y| ตั้งแต่สัดส่วนนี้ของเต็มสเกลนับว่าชน
+MAX_CLIP_RATIO = 0.001  # ชนเต็มสเกลเกิน 0.1% ของตัวอย่าง = clip ต่อเนื่อง ไม่ใช่แค่ยอดเคาะแตะขอบ
+MIN_SNR_DB = 20.0
+NOISE_PERCENTILE = 10
+
+SILENT = "silent"
+CLIPPED = "clipped"
+LOW_SNR = "low_snr"
+REASON_LABELS = {SILENT: "เงียบ", CLIPPED: "clip", LOW_SNR: "SNR ต่ำ"}
+REASONS = {
+    SILENT: "เสียงเงียบเกินไป ตรวจสอบไมโครโฟนแล้วอัดใหม่",
+    CLIPPED: "เสียงดังจนเกินช่วงที่อัดได้ (clipping) ลดระดับเสียงหรือถอยไมโครโฟนออกแล้วอัดใหม่",
+    LOW_SNR: "ไม่พบเสียงเคาะที่เด่นกว่าเสียงรบกวน เคาะให้ชัดขึ้นหรืออัดในที่เงียบกว่า",
+}
+
+
+@dataclass
+class QualityReport:
+    reason: str  # "" = ผ่าน
+    rms_db: float
+    peak_db: float
+    clip_ratio: float
+    snr_db: float
+
+    @property
+    def ok(self):
+        return not self.reason
+
+    @property
+    def message(self):
+        return REASONS.get(self.reason, "")
+
+    def as_dict(self):
+        return asdict(self)
+
+
+class RejectedCapture(ValueError):
+    def __init__(self, report):
+        super().__init__(report)  # args = (report,) จึง pickle ข้าม process pool ได้
+        self.report = report
+
+    def __str__(self):
+        return f"{self.report.reason}: {self.report.message}"
+
+
+def _db(ratio):
+    return max(20 * float(np.log10(ratio)), FLOOR_DB) if ratio > 0 else FLOOR_DB
+
+
+def assess(y):
+    if not len(y):
+        return QualityReport(SILENT, FLOOR_DB, FLOOR_DB, 0.0, 0.0)
+    with timed("gate"):
+        n = len(y) // FRAME
+        frames = y[: n * FRAME].reshape(n, FRAME) if n else y.reshape(1, -1)
+        if frames.size > PREVIEW_SAMPLES:
+            frames = frames[np.linspace(0, len(frames) - 1, PREVIEW_SAMPLES // FRAME).astype(np.intp)]
+        scale = wav.full_scale(y)
+
+        # ชนิดเดิม (เช่น int16) เทียบกับเกณฑ์จำนวนเต็มได้เลย ไม่ต้องแปลงก่อนนับ clip
+        limit = CLIP_LEVEL * scale
+        if np.issubdtype(frames.dtype, np.integer):
+            limit = int(np.ceil(limit))
+        clip_ratio = float(np.count_nonzero(frames >= limit) + np.count_nonzero(frames <= -limit)) / frames.size
+        x = frames.astype(np.float32) * np.float32(1 / scale)
+        energy = np.einsum("ij,ij->i", x, x, dtype=np.float64) / frames.shape[1]
+
+        rms_db = _db(float(np.sqrt(np.mean(energy))))
+        peak_db = _db(max(float(np.max(x)), -float(np.min(x))))
+        snr_db = _db(float(np.sqrt(np.max(energy)))) - _db(float(np.sqrt(np.percentile(energy, NOISE_PERCENTILE))))
+
+        if rms_db < SILENCE_DBFS:
+            reason = SILENT
+        elif clip_ratio > MAX_CLIP_RATIO:
+            reason = CLIPPED
+        elif snr_db < MIN_SNR_DB:
+            reason = LOW_SNR
+        else:
+            reason = ""
+    return QualityReport(reason, rms_db, peak_db, clip_ratio, snr_db)
+
+
+# ผ่าน: คืนรายงาน ไม่ผ่าน: RejectedCapture (ก่อนเริ่มงานสเปกตรัมใดๆ)
+def gate(y):
+    report = assess(y)
+    if not report.ok:
+        raise RejectedCapture(report)
+    return report
+
+
+# ไฟล์ที่วิเคราะห์แบบ streaming: ตรวจจาก view ของ WAV โดยตรง (รูปแบบอื่นข้ามการตรวจ)
+def gate_source(source):
+    fast = wav.read(source)
+    if fast is not None:
+        gate(fast[0])
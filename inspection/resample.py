@@ -0,0 +1,103 @@
+# ลด sample rate ตามวัสดุก่อนทำสเปกตรัม (กรองผ่านต่ำกัน aliasing แล้ว decimate แบบ polyphase)
+# เช่น อิฐมวลเบาสนใจแค่ ~400 Hz จึงไม่ต้อง FFT สัญญาณ 48/192 kHz ทั้งหมด
+from functools import lru_cache
+
+import numpy as np
+
+from .engine import InspectionResult, analyze, classify, BandBound, first_channel, peak_abs, pick_peak, windowed_rfft
+from .metrics import timed
+
+FILTER_PHASES = 16  # ความยาว filter = FILTER_PHASES * อัตราลด
+RATE_MARGIN = 4.0  # sample rate ใหม่อย่างน้อยกี่เท่าของความถี่สูงสุดของแถบ
+PASSBAND_RIPPLE = 0.005
+
+
+# windowed-sinc low-pass แบ่งเป็น polyphase (phases, factor), DC gain = 1
+@lru_cache(maxsize=16)
+def polyphase_lowpass(factor, phases=FILTER_PHASES):
+    length = phases * factor
+    t = np.arange(length) - (length - 1) / 2
+    h = np.sinc(t / factor * 0.8) * np.hamming(length)
+    h /= h.sum()
+    h = h.reshape(phases, factor).astype(np.float32)
+    h.flags.writeable = False
+    return h
+
+
+# ผลลัพธ์ยาว ceil(n / factor) ตัวอย่าง โดยตัวอย่างที่ k อยู่ตรงกับเวลา k * factor ของสัญญาณเดิม
+def fir_decimate(x, factor, phases=FILTER_PHASES):
+    if factor == 1:
+        return x
+    h = polyphase_lowpass(factor, phases)
+    out_len = -(-len(x) // factor)
+    front = phases // 2 * factor
+    rows = out_len + phases - 1
+    # คัดลอกลง buffer single precision ที่เติมศูนย์แล้วเพียงครั้งเดียว
+    buf = np.zeros(rows * factor, dtype=np.complex64 if np.iscomplexobj(x) else np.float32)
+    buf[front : front + len(x)] = x
+    x = buf.reshape(rows, factor)
+    # out[k] = sum_p x[k + p] . h[p]  (ไม่ต้องสร้าง matrix ของ sliding window)
+    out = x[:out_len] @ h[0]
+    for p in range(1, phases):
+        out += x[p : out_len + p] @ h[p]
+    return out
+
+
+# อัตราลดและขอบ passband (gain เพี้ยนไม่เกิน PASSBAND_RIPPLE) คำนวณครั้งเดียวต่อ sample rate
+@lru_cache(maxsize=32)
+def decimation_plan(freq_high, sr):
+    factor = max(int(sr / (RATE_MARGIN * freq_high)), 1)
+    if factor == 1:
+        return 1, sr / 2
+    h = polyphase_lowpass(factor).ravel().astype(np.float64)
+    f = np.fft.rfftfreq(64 * len(h), d=1 / sr)
+    gain = np.abs(np.fft.rfft(h, 64 * len(h)))
+    passband = f[np.argmax(np.abs(gain - 1) > PASSBAND_RIPPLE)]
+    if passband < freq_high:
+        return 1, sr / 2
+    return factor, float(passband)
+
+
+def analyze_decimated(y, sr, profile, dtype=np.float64, verify_full_band=True):
+    y = first_channel(y)
+    factor, passband = decimation_plan(profile.freq_high, sr)
+    if factor == 1:
+        return analyze(y, sr, profile, dtype)
+
+    # ความถี่ที่สูงกว่า passband จะถูกตัดทิ้ง แต่ผลตัดสินต้องใช้ยอดสูงสุดทั้งย่านเหมือน analyze()
+    # (เช่น อิฐที่มียอด 3 kHz ต้องได้ "Amplitude too high" ไม่ใช่ยอดในแถบ) จึงหาขอบบนจากเฟรมสั้นก่อน
+    # ถ้าทายได้ว่านอก passband สูงกว่า ต้องใช้ FFT ทั้งไฟล์อยู่แล้ว จึงไม่ต้อง decimate
+    # verify_full_band=False ดูเฉพาะย่านต่ำกว่า passband
+    if verify_full_band:
+        bound = BandBound(y, sr, 0.0, passband)
+        with timed("fft"):
+            predicted = bound.likely_outside()
+        if predicted:
+            return analyze(y, sr, profile, dtype)
+
+    with timed("window") as span:
+        yd = fir_decimate(y, factor)
+        span.add(yd)
+    frequencies, magnitudes = windowed_rfft(yd.astype(dtype), sr / factor)
+    # Normalize ด้วยค่าสูงสุดของสัญญาณเดิม และคูณอัตราลดให้สเกลเท่ากับ FFT ทั้งไฟล์
+    with timed("window"):
+        scale = 1 / (peak_abs(y) or 1.0)
+        keep = frequencies <= passband
+        frequencies = frequencies[keep]
+        magnitudes = magnitudes[keep] * (factor * scale)
+    peak_freq, peak_amp = pick_peak(frequencies, magnitudes)
+
+    # ยอดในย่านต้องสูงกว่าขอบบนนอก passband จึงเป็นยอดสูงสุดจริง ไม่เช่นนั้นคำนวณ FFT ทั้งไฟล์
+    if verify_full_band:
+        with timed("fft"):
+            outside = bound.bounds()[1]
+        if outside * scale >= peak_amp:
+            return analyze(y, sr, profile, dtype)
+
+    return InspectionResult(
+        peak_freq=peak_freq,
+        peak_amp=peak_amp,
+        result=classify(peak_freq, peak_amp, profile),
+        frequencies=frequencies,
+        magnitudes=magnitudes,
+    )
@@ -0,0 +1,247 @@
+# HTTP service สำหรับเครื่องบันทึกเสียงที่สายการผลิต (ไม่ต้องใช้ Streamlit)
+#
+#   python -m inspection.server --port 8502 --workers 2 --queue 8
+#   curl --data-binary @tap.wav -H "Content-Type: audio/wav" "http://localhost:8502/inspect/steel?method=full"
+#
+# POST /inspect/<material>[?method=full|taps|zoom&name=...]  body = ไฟล์ WAV -> JSON ผลตรวจ
+#                                                             (method = วิธีที่ใช้จริง, ไฟล์ใหญ่เป็น "stream")
+# GET  /health                                                -> สถานะคิว
+# GET  /metrics                                               -> เวลาแต่ละขั้นตอน (Prometheus text format)
+# วิเคราะห์ใน worker pool ขนาดจำกัด ถ้างานค้างเต็มคิวตอบ 503 + Retry-After ทันที (backpressure)
+# ผลบันทึกลง ResultStore เดียวกับหน้าเว็บ (ไฟล์เดียวกันบันทึกครั้งเดียวตาม hash)
+# เสียงที่ไม่ผ่านการตรวจคุณภาพตอบ 422 พร้อม reason และค่าที่วัดได้ (บันทึกในตาราง rejections)
+# ไฟล์ที่ถอดรหัสไม่ได้ตอบ 422 ข้อผิดพลาดอื่นตอบ 500 และพิมพ์ traceback ลง stderr
+import argparse
+import json
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import soundfile as sf
+
+from .cache import AnalysisCache, audio_digest, cache_key
+from .methods import METHODS, analyze_audio, used_method
+from .metrics import REGISTRY, Trace, capture, current, inspection, timed
+from .profiles import PROFILES, get_profile
+from .quality import RejectedCapture
+from .store import DEFAULT_DB, ResultStore
+
+MAX_BODY = 64 * 2**20
+TIMEOUT = 60.0  # วินาทีที่รอผลวิเคราะห์ต่อคำขอ
+RETRY_AFTER = 1
+# ไฟล์เสียหาย/ไม่ใช่ WAV: soundfile และ load_audio/wav.read แจ้งด้วยชนิดเหล่านี้
+DECODE_ERRORS = (ValueError, sf.SoundFileError)
+
+
+class Busy(Exception):
+    pass
+
+
+# ทำงานใน worker (thread หรือ process) คืนเฉพาะค่าสรุปและเวลาแต่ละขั้นตอน ไม่ส่งสเปกตรัมกลับ
+def analyze_bytes(data, material, method):
+    with capture(Trace(material)) as trace:
+        r = analyze_audio(data, len(data), get_profile(material), method)
+    return {"peak_freq": r.peak_freq, "peak_amp": r.peak_amp, "result": r.result}, trace.stages
+
+
+class InspectionService:
+    def __init__(self, store, workers=2, queue_size=8, processes=False, cache=None):
+        pool = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        self.pool = pool(max_workers=workers)
+        self.store = store
+        # ResultStore เปิด connection ต่อ thread แต่ ThreadingHTTPServer สร้าง thread ใหม่ทุก request
+        # จึงเขียนผ่าน thread เดียวที่อยู่ตลอดอายุ service (ใช้ connection เดียว SQLite เขียนทีละรายการอยู่แล้ว)
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inspection-store")
+        self.cache = cache if cache is not None else AnalysisCache(max_bytes=16 * 2**20, directory=None)
+        self.capacity = workers + queue_size
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = self.rejected = self.failed = self.unusable = 0  # rejected = ตอบ 503, unusable = ไม่ผ่านการตรวจคุณภาพ
+
+    def submit(self, data, material, method):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise Busy()
+        with self._lock:
+            self.pending += 1
+        try:
+            future = self.pool.submit(analyze_bytes, data, material, method)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future):
+        with self._lock:
+            self.pending -= 1
+            error = None if future is None or future.cancelled() else future.exception()
+            if future is not None and not future.cancelled() and error is None:
+                self.completed += 1
+            elif isinstance(error, RejectedCapture):
+                self.unusable += 1
+            else:
+                self.failed += 1
+        self._slots.release()
+
+    def _write(self, fn, *args, **kwargs):
+        return self._writer.submit(fn, *args, **kwargs).result()
+
+    def inspect(self, data, material, method="full", timeout=TIMEOUT):
+        profile = get_profile(material)
+        digest = audio_digest(data)
+        key = cache_key(digest, profile, method)
+        summary = self.cache.get(key)
+        if summary is None:
+            try:
+                summary, stages = self.submit(data, profile.key, method).result(timeout)
+            except RejectedCapture as e:
+                self._write(self.store.log_rejection, profile.key, e.report, source="http", audio_hash=digest)
+                raise
+            if current() is not None:
+                current().merge(stages)
+            self.cache.put(key, summary)
+        logged = self._write(self.store.append, profile.key, summary["peak_freq"], summary["peak_amp"], summary["result"], audio_hash=digest)
+        # method = วิธีที่ใช้จริง (ไฟล์ใหญ่วิเคราะห์แบบ stream ไม่ว่าขอวิธีใด)
+        return {"material": profile.key, "method": used_method(len(data), method), "requested_method": method,
+                "audio_hash": digest, "logged": logged, **summary}
+
+    def status(self):
+        with self._lock:
+            return {
+                "pending": self.pending,
+                "capacity": self.capacity,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "failed": self.failed,
+                "unusable": self.unusable,
+            }
+
+    # เวลาแต่ละขั้นตอนจาก REGISTRY ต่อท้ายด้วยสถานะคิว
+    def metrics(self):
+        lines = [REGISTRY.prometheus()]
+        for name, value in self.status().items():
+            kind = "gauge" if name in ("pending", "capacity") else "counter"
+            metric = f"inspection_requests_{name}" + ("_total" if kind == "counter" else "")
+            lines.append(f"# TYPE {metric} {kind}\n{metric} {value}\n")
+        return "".join(lines)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        self._write(self.store.close)
+        self._writer.shutdown(wait=True)
+
+
+class InspectionHandler(BaseHTTPRequestHandler):
+    service = None  # กำหนดโดย make_server
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, body, headers=(), content_type="application/json"):
+        payload = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/health":
+            return self._send(200, {"status": "ok", **self.service.status()})
+        if path == "/metrics":
+            return self._send(200, self.service.metrics(), content_type="text/plain; version=0.0.4")
+        self._send(404, {"error": f"not found: {path}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] != "inspect":
+            return self._send(404, {"error": f"not found: {url.path}"})
+        query = parse_qs(url.query)
+        method = query.get("method", ["full"])[0]
+        if parts[1].lower() not in PROFILES or method not in METHODS:
+            return self._send(400, {"error": f"expected /inspect/<{'|'.join(PROFILES)}>?method=<{'|'.join(METHODS)}>"})
+
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True  # ไม่รู้ความยาว body จึงอ่านคำขอถัดไปในการเชื่อมต่อนี้ไม่ได้
+            return self._send(400, {"error": "Content-Length must be a non-negative integer"})
+        if length == 0:
+            return self._send(400, {"error": "empty body; POST the WAV file as the request body"})
+        if length > MAX_BODY:
+            self.close_connection = True
+            return self._send(413, {"error": f"body larger than {MAX_BODY} bytes"})
+
+        with inspection(parts[1].lower(), source="http", method=method):
+            with timed("read") as span:
+                data = self.rfile.read(length)
+                span.add(data)
+            t0 = time.perf_counter()
+            try:
+                body = self.service.inspect(data, parts[1], method)
+            except Busy:
+                return self._send(503, {"error": "busy, retry later"}, [("Retry-After", str(RETRY_AFTER))])
+            except FutureTimeout:
+                return self._send(504, {"error": "analysis timed out"})
+            except RejectedCapture as e:
+                return self._send(422, {"error": str(e), "reason": e.report.reason, "quality": e.report.as_dict()})
+            except DECODE_ERRORS as e:
+                return self._send(422, {"error": str(e)})
+            except Exception:
+                sys.stderr.write(f"{self.address_string()} POST {self.path} failed\n{traceback.format_exc()}")
+                return self._send(500, {"error": "internal error"})
+        body["name"] = query.get("name", [""])[0]
+        body["elapsed_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+        self._send(200, body)
+
+
+def make_server(service, host="127.0.0.1", port=8502, verbose=False):
+    handler = type("Handler", (InspectionHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.verbose = verbose
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m inspection.server", description="Headless HTTP inspection endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--db", default=DEFAULT_DB, help="results database shared with the Streamlit pages")
+    parser.add_argument("--workers", type=int, default=2, help="concurrent analyses")
+    parser.add_argument("--queue", type=int, default=8, help="requests allowed to wait for a worker before answering 503")
+    parser.add_argument("--processes", action="store_true", help="run analyses in worker processes instead of threads")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    service = InspectionService(ResultStore(args.db), args.workers, args.queue, args.processes)
+    server = make_server(service, args.host, args.port, args.verbose)
+    print(f"inspection service on http://{args.host}:{server.server_port} ({args.workers} workers, queue {args.queue}, db {args.db})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
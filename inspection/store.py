@@ -0,0 +1,309 @@
+# ที่เก็บผลการทดสอบ (SQLite โหมด WAL) แทนการอ่าน-เขียน Excel ทั้งไฟล์ทุกครั้ง
+#
+#   python -m inspection.store import test_results_Steel.xlsx --material steel
+#   python -m inspection.store rejections --material steel     # เสียงที่ไม่ผ่านการตรวจคุณภาพ
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from functools import lru_cache
+
+from .metrics import timed
+
+DEFAULT_DB = os.environ.get("INSPECTION_DB", "test_results.db")
+TIMEZONE = "Asia/Bangkok"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# ชื่อคอลัมน์ตามไฟล์ Excel เดิม
+COLUMNS = ["Timestamp", "Peak Frequency (Hz)", "Peak Amplitude", "Result"]
+
+# migration ตาม PRAGMA user_version (เพิ่มต่อท้ายเท่านั้น)
+MIGRATIONS = [
+    """
+    CREATE TABLE results (
+        id INTEGER PRIMARY KEY,
+        timestamp TEXT NOT NULL,
+        material TEXT NOT NULL,
+        peak_freq REAL,
+        peak_amp REAL,
+        result TEXT NOT NULL
+    );
+    CREATE INDEX idx_results_timestamp ON results (timestamp);
+    CREATE INDEX idx_results_material_timestamp ON results (material, timestamp);
+    CREATE TABLE imports (
+        path TEXT PRIMARY KEY,
+        material TEXT NOT NULL,
+        rows INTEGER NOT NULL,
+        imported_at TEXT NOT NULL
+    );
+    """,
+    """
+    CREATE INDEX idx_results_material_result_timestamp ON results (material, result, timestamp);
+    """,
+    """
+    ALTER TABLE results ADD COLUMN audio_hash TEXT;
+    CREATE UNIQUE INDEX idx_results_material_audio_hash ON results (material, audio_hash) WHERE audio_hash IS NOT NULL;
+    """,
+    """
+    CREATE TABLE rejections (
+        id INTEGER PRIMARY KEY,
+        timestamp TEXT NOT NULL,
+        material TEXT NOT NULL,
+        reason TEXT NOT NULL,
+        rms_db REAL,
+        peak_db REAL,
+        clip_ratio REAL,
+        snr_db REAL,
+        source TEXT,
+        audio_hash TEXT
+    );
+    CREATE INDEX idx_rejections_material_timestamp ON rejections (material, timestamp);
+    CREATE UNIQUE INDEX idx_rejections_material_audio_hash ON rejections (material, audio_hash) WHERE audio_hash IS NOT NULL;
+    """,
+]
+REJECTION_COLUMNS = ["Timestamp", "Reason", "RMS (dBFS)", "Peak (dBFS)", "Clip Ratio", "SNR (dB)", "Source"]
+
+
+@lru_cache(maxsize=None)
+def bangkok_tz():
+    import pytz  # สำหรับ timezone
+
+    return pytz.timezone(TIMEZONE)
+
+
+def now():
+    return datetime.now(bangkok_tz()).strftime(TIMESTAMP_FORMAT)
+
+
+class ResultStore:
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self._local = threading.local()
+        self._migrate()
+
+    # หนึ่ง connection ต่อ thread (แต่ละ session ของ Streamlit รันคนละ thread)
+    @property
+    def conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    # ปิด connection ของ thread ที่เรียก (thread อื่นต้องปิดของตัวเอง)
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _migrate(self):
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for i, script in enumerate(MIGRATIONS[version:], start=version + 1):
+                for statement in filter(str.strip, script.split(";")):
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {i}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    # คืนค่า False ถ้าไฟล์เสียงเดียวกัน (audio_hash) เคยถูกบันทึกไว้แล้ว
+    def append(self, material, peak_freq, peak_amp, result, timestamp=None, audio_hash=None):
+        with timed("persist"):
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO results (timestamp, material, peak_freq, peak_amp, result, audio_hash) VALUES (?, ?, ?, ?, ?, ?)",
+                (timestamp or now(), material, peak_freq, peak_amp, result, audio_hash),
+            )
+        return cursor.rowcount > 0
+
+    # บันทึกหลายแถวใน transaction เดียว rows: (material, peak_freq, peak_amp, result, timestamp[, audio_hash])
+    # คืน True/False ต่อแถว (False = ไฟล์เสียงนี้เคยบันทึกแล้ว)
+    def append_many(self, rows):
+        conn = self.conn
+        with timed("persist"):
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                inserted = [
+                    conn.execute(
+                        "INSERT OR IGNORE INTO results (timestamp, material, peak_freq, peak_amp, result, audio_hash) VALUES (?, ?, ?, ?, ?, ?)",
+                        (ts or now(), m, f, a, r, h[0] if h else None),
+                    ).rowcount > 0
+                    for m, f, a, r, ts, *h in rows
+                ]
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return inserted
+
+    # เสียงที่ไม่ผ่านการตรวจคุณภาพ (inspection.quality) แยกจากผลตรวจ คืนค่า False ถ้าไฟล์เดียวกันเคยบันทึกแล้ว
+    def log_rejection(self, material, report, source=None, timestamp=None, audio_hash=None):
+        with timed("persist"):
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO rejections (timestamp, material, reason, rms_db, peak_db, clip_ratio, snr_db, source, audio_hash)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (timestamp or now(), material, report.reason, report.rms_db, report.peak_db, report.clip_ratio, report.snr_db, source, audio_hash),
+            )
+        return cursor.rowcount > 0
+
+    def rejections(self, material, start=None, end=None, limit=None):
+        where, params = self._where(material, start, end)
+        sql = f"SELECT timestamp, reason, rms_db, peak_db, clip_ratio, snr_db, source FROM rejections WHERE {where} ORDER BY timestamp DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.conn.execute(sql, params).fetchall()
+
+    # จำนวนที่ถูกตีกลับแยกตามเหตุผล
+    def rejection_counts(self, material, start=None, end=None):
+        where, params = self._where(material, start, end)
+        return dict(self.conn.execute(f"SELECT reason, COUNT(*) FROM rejections WHERE {where} GROUP BY reason ORDER BY reason", params))
+
+    # เงื่อนไขกรองข้อมูล: start/end เป็น date หรือข้อความ "YYYY-MM-DD" (รวมวันสุดท้าย)
+    @staticmethod
+    def _where(material, start=None, end=None, result=None):
+        clauses, params = ["material = ?"], [material]
+        if start:
+            clauses.append("timestamp >= ?")
+            params.append(str(start))
+        if end:
+            clauses.append("timestamp < date(?, '+1 day')")
+            params.append(str(end))
+        if result:
+            clauses.append("result = ?")
+            params.append(result)
+        return " AND ".join(clauses), params
+
+    def query(self, material, start=None, end=None, result=None, limit=None, offset=0, newest_first=False):
+        where, params = self._where(material, start, end, result)
+        order = "DESC" if newest_first else "ASC"
+        sql = f"SELECT timestamp, peak_freq, peak_amp, result FROM results WHERE {where} ORDER BY timestamp {order}, id {order}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        return self.conn.execute(sql, params).fetchall()
+
+    # อ่านทีละชุดด้วย cursor แทน fetchall (ใช้กับการ export ขนาดใหญ่)
+    def iter_query(self, material, start=None, end=None, result=None, batch_size=5000):
+        where, params = self._where(material, start, end, result)
+        cursor = self.conn.execute(
+            f"SELECT timestamp, peak_freq, peak_amp, result FROM results WHERE {where} ORDER BY timestamp, id",
+            params,
+        )
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cursor.close()
+
+    def fetch(self, material):
+        return self.query(material)
+
+    def to_dataframe(self, material, **filters):
+        import pandas as pd
+
+        return pd.DataFrame(self.query(material, **filters), columns=COLUMNS)
+
+    def count(self, material, start=None, end=None, result=None):
+        where, params = self._where(material, start, end, result)
+        return self.conn.execute(f"SELECT COUNT(*) FROM results WHERE {where}", params).fetchone()[0]
+
+    # ลบทั้งสองตารางใน transaction เดียว ผู้อ่านไม่เห็นสถานะที่ลบไปแค่ตารางเดียว
+    def clear(self, material):
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM results WHERE material = ?", (material,))
+            conn.execute("DELETE FROM rejections WHERE material = ?", (material,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    # นำเข้าไฟล์ Excel เดิมครั้งเดียว (ไฟล์ที่นำเข้าแล้วจะถูกข้าม)
+    def import_excel(self, xlsx_path, material):
+        key = os.path.abspath(xlsx_path)
+        if self.conn.execute("SELECT 1 FROM imports WHERE path = ?", (key,)).fetchone():
+            return 0
+
+        import pandas as pd
+
+        df = pd.read_excel(xlsx_path)
+        missing = set(COLUMNS) - set(df.columns)
+        if missing:
+            raise ValueError(f"{xlsx_path}: missing columns {sorted(missing)}")
+        timestamps = pd.to_datetime(df["Timestamp"]).dt.strftime(TIMESTAMP_FORMAT)
+        rows = [
+            (material, _float(f), _float(a), str(r), ts)
+            for ts, f, a, r in zip(timestamps, df["Peak Frequency (Hz)"], df["Peak Amplitude"], df["Result"])
+        ]
+
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # ตรวจซ้ำภายใน transaction เผื่อ session อื่นนำเข้าไปพร้อมกัน
+            if conn.execute("SELECT 1 FROM imports WHERE path = ?", (key,)).fetchone():
+                conn.execute("ROLLBACK")
+                return 0
+            conn.executemany(
+                "INSERT INTO results (material, peak_freq, peak_amp, result, timestamp) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.execute(
+                "INSERT INTO imports (path, material, rows, imported_at) VALUES (?, ?, ?, ?)",
+                (key, material, len(rows), now()),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return len(rows)
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def main(argv=None):
+    from .profiles import PROFILES
+
+    parser = argparse.ArgumentParser(prog="python -m inspection.store", description="Manage the inspection results store.")
+    parser.add_argument("--db", default=DEFAULT_DB)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("import", help="import a legacy test_results_*.xlsx workbook (once)")
+    p.add_argument("xlsx")
+    p.add_argument("--material", choices=sorted(PROFILES), required=True)
+    p = sub.add_parser("rejections", help="list recordings rejected by the quality gate")
+    p.add_argument("--material", choices=sorted(PROFILES), required=True)
+    p.add_argument("--limit", type=int, default=20, help="most recent rejections to list")
+    args = parser.parse_args(argv)
+
+    store = ResultStore(args.db)
+    if args.command == "import":
+        n = store.import_excel(args.xlsx, args.material)
+        print(f"imported {n} rows from {args.xlsx}" if n else f"{args.xlsx} was already imported")
+    elif args.command == "rejections":
+        counts = store.rejection_counts(args.material)
+        print(", ".join(f"{reason}: {n}" for reason, n in counts.items()) or "no rejections")
+        for ts, reason, rms, peak, clip, snr, source in store.rejections(args.material, limit=args.limit):
+            print(f"{ts}  {reason:<8} rms {rms:7.1f} dBFS  peak {peak:7.1f} dBFS  clip {clip:7.2%}  snr {snr:6.1f} dB  {source or ''}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
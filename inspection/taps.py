@@ -0,0 +1,149 @@
+# หาจังหวะเคาะ (onset) ในไฟล์เดียว แล้ววิเคราะห์แต่ละครั้งที่เคาะด้วย FFT แบบ batch
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from .engine import DEFECTIVE, GOOD, TOO_LOUD, analyze, classify, first_channel, normalize
+from .metrics import timed
+
+FRAME_SECONDS = 0.005
+TAP_SECONDS = 0.5
+PRE_SECONDS = 0.005
+MIN_GAP_SECONDS = 0.25
+THRESHOLD_DB = 15.0  # เหนือระดับเสียงพื้น
+RELATIVE_DB = 30.0  # ไม่ต่ำกว่าครั้งที่ดังที่สุดเกินนี้
+
+
+@dataclass
+class TapAnalysis:
+    onsets: np.ndarray  # วินาที
+    peak_freqs: np.ndarray
+    peak_amps: np.ndarray
+    results: list
+    result: str
+    frequencies: np.ndarray
+    tap_magnitudes: np.ndarray  # (จำนวนครั้งที่เคาะ, bin)
+
+    @property
+    def peak_freq(self):
+        return float(np.median(self.peak_freqs))
+
+    @property
+    def peak_amp(self):
+        return float(np.max(self.peak_amps))
+
+    # สเปกตรัมเฉลี่ยของทุกครั้งที่เคาะ (สำหรับกราฟ)
+    @property
+    def magnitudes(self):
+        return self.tap_magnitudes.mean(axis=0)
+
+    def table(self):
+        import pandas as pd
+
+        return pd.DataFrame({
+            "Onset (s)": np.round(self.onsets, 3),
+            "Peak Frequency (Hz)": self.peak_freqs,
+            "Peak Amplitude": self.peak_amps,
+            "Result": self.results,
+        })
+
+
+def frame_energy(y, frame):
+    n = len(y) // frame * frame
+    return np.mean(np.square(y[:n].reshape(-1, frame)), axis=1)
+
+
+def detect_onsets(y, sr, threshold_db=THRESHOLD_DB, relative_db=RELATIVE_DB, min_gap=MIN_GAP_SECONDS):
+    frame = max(int(sr * FRAME_SECONDS), 1)
+    energy = frame_energy(y, frame)
+    if not energy.size or not energy.max() > 0:
+        return np.array([], dtype=np.intp)
+
+    floor = np.percentile(energy, 20)
+    threshold = max(floor * 10 ** (threshold_db / 10), energy.max() * 10 ** (-relative_db / 10))
+    above = energy > threshold
+    rising = np.flatnonzero(above & ~np.concatenate([[False], above[:-1]]))
+
+    # เว้นระยะขั้นต่ำระหว่างครั้งที่เคาะ (เสียงก้องของครั้งก่อนไม่นับเป็นครั้งใหม่)
+    gap = int(min_gap * sr / frame)
+    onsets = []
+    for i in rising:
+        if not onsets or i - onsets[-1] >= gap:
+            onsets.append(i)
+    return np.asarray(onsets, dtype=np.intp) * frame
+
+
+@lru_cache(maxsize=8)
+def _nfft(length):
+    return 1 << int(np.ceil(np.log2(2 * length)))
+
+
+# window ไม่สมมาตร: ขึ้นครึ่ง Hamming ในช่วงก่อนเคาะ แล้วลงครึ่ง Hamming จากจังหวะเคาะถึงท้าย
+# (Hamming สมมาตรยาว 0.5 วินาทีมีค่าแค่ ~0.08 ตรงจังหวะเคาะ จึงกดเสียงเคาะสั้นๆ จนเสียงฮัมดังกว่า)
+@lru_cache(maxsize=8)
+def tap_window(length, pre, dtype=np.float64):
+    pre = min(pre, length - 1)
+    w = np.concatenate([np.hamming(2 * pre)[:pre], np.hamming(2 * (length - pre))[length - pre :]]).astype(dtype)
+    w.flags.writeable = False
+    return w
+
+
+def tap_windows(y, onsets, length, pre):
+    starts = np.maximum(np.asarray(onsets) - pre, 0)
+    idx = starts[:, None] + np.arange(length)
+    # ครั้งสุดท้ายที่อยู่ท้ายไฟล์เติมศูนย์
+    return np.where(idx < len(y), y[np.minimum(idx, len(y) - 1)], 0)
+
+
+# แอมพลิจูดเทียบเท่า FFT ทั้งไฟล์ของแต่ละครั้งที่เคาะ: DFT ที่ความถี่ยอดของครั้งนั้น โดยถ่วงด้วย
+# Hamming ยาวทั้งไฟล์ตรงตำแหน่งเดียวกัน (ส่วนที่ครั้งนี้ให้กับ |X(f)| ของ analyze()) จึงเทียบกับ
+# max_amplitude ที่ตั้งจาก FFT ทั้งไฟล์ได้ (window ยาว 0.5 วินาทีกดช่วงต้นของเสียงเคาะ ค่าจึงต่ำกว่าหลายเท่า)
+def whole_file_amplitudes(frames, starts, n, freqs, sr):
+    idx = starts[:, None] + np.arange(frames.shape[1])
+    weighted = frames * (0.54 - 0.46 * np.cos(2 * np.pi * idx / max(n - 1, 1)))
+    phase = (np.outer(freqs * (2 * np.pi / sr), np.arange(frames.shape[1])) % (2 * np.pi)).astype(np.float32)
+    re = np.einsum("ij,ij->i", weighted, np.cos(phase))
+    im = np.einsum("ij,ij->i", weighted, np.sin(phase))
+    return np.hypot(re, im)
+
+
+def aggregate(results):
+    if TOO_LOUD in results:
+        return TOO_LOUD
+    counts = Counter(results)
+    return GOOD if counts[GOOD] > counts[DEFECTIVE] else DEFECTIVE
+
+
+def analyze_taps(y, sr, profile, tap_seconds=TAP_SECONDS, dtype=np.float64):
+    y = normalize(first_channel(y), dtype)
+    onsets = detect_onsets(y, sr)
+    if not len(onsets):
+        # ไม่พบจังหวะเคาะชัดเจน ใช้การวิเคราะห์ทั้งไฟล์แบบเดิม
+        r = analyze(y, sr, profile, dtype)
+        return TapAnalysis(np.array([0.0]), np.array([r.peak_freq]), np.array([r.peak_amp]), [r.result], r.result,
+                           r.frequencies, r.magnitudes[None, :])
+
+    length = int(tap_seconds * sr)
+    pre = int(PRE_SECONDS * sr)
+    with timed("window") as span:
+        raw = tap_windows(y, onsets, length, pre)
+        frames = raw * tap_window(length, pre, raw.dtype)
+        span.add(raw, frames)
+
+    # FFT ทุกครั้งที่เคาะพร้อมกันในครั้งเดียว (เติมศูนย์ให้ bin ละเอียดขึ้น)
+    nfft = _nfft(length)
+    with timed("fft") as span:
+        magnitudes = np.abs(np.fft.rfft(frames, n=nfft, axis=1))[:, : nfft // 2]
+        frequencies = np.fft.rfftfreq(nfft, d=1 / sr)[: nfft // 2]
+        span.add(magnitudes)
+
+    with timed("peak"):
+        peak_idx = np.argmax(magnitudes, axis=1)
+        peak_freqs = frequencies[peak_idx]
+        # ปรับสเกลสเปกตรัมแต่ละครั้งให้ยอดเท่ากับแอมพลิจูดเทียบเท่าทั้งไฟล์ (กรณีไม่พบจังหวะเคาะก็สเกลเดียวกัน)
+        peak_amps = whole_file_amplitudes(raw, np.maximum(onsets - pre, 0), len(y), peak_freqs, sr)
+        magnitudes *= (peak_amps / np.maximum(magnitudes[np.arange(len(peak_idx)), peak_idx], 1e-300))[:, None]
+    results = [classify(f, a, profile) for f, a in zip(peak_freqs, peak_amps)]
+    return TapAnalysis(onsets / sr, peak_freqs, peak_amps, results, aggregate(results), frequencies, magnitudes)
@@ -0,0 +1,478 @@
+# ส่วน UI ที่ใช้ร่วมกันระหว่างหน้า Steel และ Brick
+#
+# หน้าแบ่งเป็นส่วนที่ rerun แยกกัน (st.fragment): ส่วนวิเคราะห์, ตารางผลก่อนหน้า,
+# ดาวน์โหลด และลบข้อมูล กดหรือเลื่อนหน้าในส่วนหนึ่งจะไม่รันอีกส่วนซ้ำ
+# ผลวิเคราะห์ล่าสุดเก็บใน st.session_state จึงไม่ต้อง decode/FFT ใหม่เมื่อทั้งหน้า rerun
+# numpy/pandas import ในฟังก์ชันที่ใช้ หน้าแรกจึงเปิดได้ก่อน (ดู inspection.warmup)
+import os
+
+import streamlit as st
+
+from .methods import STREAMING_BYTES, analyze_audio, used_method
+from .metrics import capture, inspection, timed
+from .store import COLUMNS, ResultStore
+
+PAGE_SIZES = [25, 50, 100, 200]
+ALL_RESULTS = "ทั้งหมด"
+STREAMED_NOTE = f"ไฟล์ใหญ่กว่า {STREAMING_BYTES // 2**20} MB จึงวิเคราะห์แบบ streaming (FFT ทั้งไฟล์ทีละช่วง) แทนวิธีที่เลือก"
+
+
+def method_labels(profile):
+    return {
+        "full": "FFT ทั้งไฟล์",
+        "taps": "🔨 แยกทีละครั้งที่เคาะ",
+        "zoom": f"🔍 ละเอียดเฉพาะช่วง {profile.band_label}",
+    }
+
+
+# ที่เก็บผลการทดสอบ ใช้ร่วมกันทุก session และทุกหน้า
+@st.cache_resource
+def get_store():
+    return ResultStore()
+
+
+# นำเข้าไฟล์ Excel เดิมของวัสดุครั้งแรกที่เปิดหน้า
+@st.cache_resource(show_spinner=False)
+def import_legacy_excel(_store, db_path, excel_file, material):
+    if excel_file and os.path.exists(excel_file):
+        return _store.import_excel(excel_file, material)
+    return 0
+
+
+# cache ผลวิเคราะห์ใช้ร่วมกันทุก session และทุกหน้า (ตั้ง INSPECTION_CACHE_DIR เพื่อเก็บลงดิสก์)
+@st.cache_resource
+def get_analysis_cache():
+    from .cache import AnalysisCache
+
+    return AnalysisCache()
+
+
+# ตัวอย่างที่รู้ผลสำหรับเทียบลายเสียง: อ่านดัชนีที่สร้างไว้แล้วแบบอ่านอย่างเดียว (python -m inspection.features
+# หรือ inspection.warmup) ไม่สร้างดัชนีระหว่างตอบ request ยังไม่มีดัชนี = ข้ามการเทียบ
+# โหลดใหม่ทุกนาที (อ่านแค่ manifest + mmap) จึงเห็นดัชนีที่สร้างเสร็จทีหลัง
+@st.cache_resource(ttl=60, show_spinner=False)
+def get_reference(root):
+    from .fingerprint import load_reference
+
+    try:
+        return load_reference(root)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+# จำนวนแถวทั้งหมด cache ไว้ (ล้างเมื่อมีการบันทึก/ลบผลใน session ใดก็ตาม)
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_count(_store, db_path, material, start, end, result):
+    return _store.count(material, start, end, result)
+
+
+def invalidate_history():
+    cached_count.clear()
+
+
+# ผลของไฟล์ที่อัปโหลดอยู่ เก็บใน session state ตาม file_id + วิธีวิเคราะห์
+# ไฟล์เดิม (hash เดียวกัน) จาก session อื่นก็ไม่ต้อง decode/FFT ซ้ำ
+# เสียงที่ไม่ผ่านการตรวจคุณภาพได้ "rejected" (QualityReport) แทน "result"
+def inspect_audio(uploaded, profile, method="full"):
+    key = f"{profile.key}_analysis"
+    saved = st.session_state.get(key)
+    if saved and saved["file_id"] == uploaded.file_id and saved["method"] == method:
+        return saved
+
+    from .cache import audio_digest, cache_key
+    from .quality import RejectedCapture
+
+    with timed("read") as span:
+        data = uploaded.getvalue()
+        span.add(data)
+    digest = audio_digest(data)
+    saved = {"file_id": uploaded.file_id, "method": method, "used": used_method(len(data), method), "digest": digest,
+             "result": None, "rejected": None, "match": None, "logged": None}
+    try:
+        saved["result"] = get_analysis_cache().get_or_compute(
+            cache_key(digest, profile, method),
+            lambda: analyze_audio(data, len(data), profile, method),
+        )
+    except RejectedCapture as e:  # ไม่ cache: ตรวจซ้ำใช้เวลาไม่กี่มิลลิวินาที
+        saved["rejected"] = e.report
+        st.session_state[key] = saved
+        return saved
+
+    # เทียบลายเสียงกับตัวอย่างที่รู้ผล (ไฟล์ใหญ่ที่วิเคราะห์แบบ streaming ข้ามไป)
+    reference = get_reference(profile.reference_dir) if profile.reference_dir else None
+    if reference is not None and len(reference) and saved["used"] != "stream":
+        from .engine import load_audio
+        from .fingerprint import audio_fingerprint
+
+        # นับเป็นขั้นเดียว ไม่ปนกับเวลา decode/FFT ของการวิเคราะห์หลัก
+        with timed("match"), capture(None):
+            fp = get_analysis_cache().get_or_compute(
+                cache_key(digest, profile, "fingerprint"),
+                lambda: audio_fingerprint(*load_audio(data)),
+            )
+            saved["match"] = reference.classify(fp)
+    st.session_state[key] = saved
+    return saved
+
+
+# แสดงผล (ตารางการเคาะ, ผลตัดสิน, กราฟ)
+def show_result(r, profile, match=None):
+    from .engine import DEFECTIVE, GOOD, TOO_LOUD
+    from .plotting import spectrum_chart
+    from .taps import TapAnalysis
+
+    st.write(f"\n🎯 **Peak Frequency:** {r.peak_freq:.2f} Hz")
+    st.write(f"📈 **Peak Amplitude:** {r.peak_amp:.2f}")
+
+    if isinstance(r, TapAnalysis):
+        st.write(f"🔨 **พบการเคาะ {len(r.onsets)} ครั้ง**")
+        st.dataframe(r.table(), hide_index=True)
+
+    # ประเมินผล
+    if r.result == TOO_LOUD:
+        st.error("⚠️ เสียงดังเกินไป ไม่สามารถวิเคราะห์ได้")
+    elif r.result == DEFECTIVE:
+        st.warning("🟥 วัสดุเสีย")
+    else:
+        st.success("✅ วัสดุดี")
+
+    # ผลจากการเทียบลายเสียง (แสดงคู่กับผลจากยอดความถี่)
+    if match is not None:
+        verdict = "✅ วัสดุดี" if match.result == GOOD else "🟥 วัสดุเสีย"
+        st.write(f"🧬 **เทียบลายเสียงกับตัวอย่างที่ใกล้ที่สุด {len(match.neighbours)} ไฟล์:** {verdict} (ความคล้าย {match.similarity:.2f})")
+        with st.expander("ตัวอย่างที่ใกล้ที่สุด"):
+            st.dataframe(
+                [{"ไฟล์": os.path.basename(p), "ผล": label, "ความคล้าย": round(s, 3)} for p, label, s in match.neighbours],
+                hide_index=True,
+            )
+
+    # แสดงกราฟ FFT (ย่อข้อมูลแล้ววาดฝั่ง browser พร้อมมุมมองซูมรอบช่วงที่ยอมรับ)
+    with inspection(profile.key, source="plot"), timed("plot"):
+        st.vega_lite_chart(spec=spectrum_chart(r.frequencies, r.magnitudes, r.peak_freq, profile))
+
+
+# เสียงที่ไม่ผ่านการตรวจคุณภาพ: บอกเหตุผลและค่าที่วัดได้ ไม่มีกราฟและไม่บันทึกเป็นผลตรวจ
+def show_rejection(report):
+    st.error(f"⛔ ไม่ผ่านการตรวจคุณภาพเสียง: {report.message}")
+    st.caption(
+        f"RMS {report.rms_db:.1f} dBFS · ยอด {report.peak_db:.1f} dBFS · "
+        f"clip {report.clip_ratio:.2%} · SNR {report.snr_db:.1f} dB"
+    )
+
+
+# ส่วนอัด/อัปโหลดเสียงและแสดงผล rerun เฉพาะส่วนนี้เมื่อเปลี่ยนตัวเลือก
+@st.fragment
+def analysis_section(store, profile):
+    mode = st.radio(
+        "เลือกรูปแบบเสียงที่ต้องการวิเคราะห์",
+        options=["record", "upload"],
+        format_func=lambda x: "🎧 อัดเสียงใหม่" if x == "record" else "📁 อัปโหลดไฟล์ (.wav เท่านั้น)",
+        key=f"{profile.key}_mode",
+    )
+    methods = method_labels(profile)
+    method = st.radio(
+        "วิธีวิเคราะห์",
+        options=list(methods),
+        format_func=methods.get,
+        horizontal=True,
+        key=f"{profile.key}_method",
+    )
+
+    if mode == "record":
+        uploaded = st.audio_input("กดปุ่มเพื่ออัดเสียง", key=f"{profile.key}_record")
+        spinner = "อ่านไฟล์..."
+    else:
+        files = st.file_uploader(
+            "ลากไฟล์มาวาง หรือเลือกเฉพาะ .wav (เลือกได้หลายไฟล์)",
+            type=["wav"],
+            accept_multiple_files=True,
+            key=f"{profile.key}_upload",
+        )
+        if len(files) > 1:
+            return batch_section(files, store, profile, method)
+        uploaded = files[0] if files else None
+        spinner = "กำลังโหลดไฟล์..."
+    if not uploaded:
+        return
+
+    with inspection(profile.key, source=mode, method=method):
+        with st.spinner(spinner):
+            saved = inspect_audio(uploaded, profile, method)
+        r = saved["result"]
+
+        # บันทึกผล (ไฟล์เดียวกันบันทึกครั้งเดียว) แล้ว rerun ทั้งหน้าเพื่อให้ตารางผลก่อนหน้าอัปเดต
+        # เสียงที่ถูกตีกลับบันทึกแยกในตาราง rejections (ไม่กระทบตารางผล จึงไม่ต้อง rerun)
+        if saved["rejected"] is not None:
+            if saved["logged"] is None:
+                saved["logged"] = store.log_rejection(profile.key, saved["rejected"], source=mode, audio_hash=saved["digest"])
+        elif saved["logged"] is None:
+            saved["logged"] = store.append(profile.key, r.peak_freq, r.peak_amp, r.result, audio_hash=saved["digest"])
+            if saved["logged"]:
+                invalidate_history()
+                st.rerun()
+
+    if saved["rejected"] is not None:
+        return show_rejection(saved["rejected"])
+    st.success("✅ โหลดเสียงเรียบร้อย วิเคราะห์เสร็จแล้ว")
+    if saved["used"] != method:
+        st.info(STREAMED_NOTE)
+    show_result(r, profile, saved["match"])
+    if not saved["logged"]:
+        st.caption("ไฟล์เสียงนี้เคยบันทึกผลไว้แล้ว จึงไม่บันทึกซ้ำ")
+
+
+# งานวิเคราะห์หลายไฟล์รันใน thread pool เบื้องหลัง (ใช้ร่วมกันทุก session)
+@st.cache_resource
+def get_executor():
+    from concurrent.futures import ThreadPoolExecutor
+
+    return ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="inspection")
+
+
+# ทำงานใน worker thread (ห้ามเรียกคำสั่ง st.* ในนี้) จับเวลาแยกเป็นการตรวจหนึ่งครั้งต่อไฟล์
+def _analyze_upload(uploaded, profile, method, cache):
+    from .cache import audio_digest, cache_key
+    from .quality import RejectedCapture
+
+    with inspection(profile.key, source="batch", method=method):
+        with timed("read") as span:
+            data = uploaded.getvalue()
+            span.add(data)
+        item = {"name": uploaded.name, "digest": audio_digest(data), "used": used_method(len(data), method),
+                "result": None, "rejected": None, "error": "", "logged": None}
+        try:
+            item["result"] = cache.get_or_compute(
+                cache_key(item["digest"], profile, method),
+                lambda: analyze_audio(data, len(data), profile, method),
+            )
+        except RejectedCapture as e:
+            item["rejected"] = e.report
+        except Exception as e:  # ไฟล์เสียหาย ไม่ให้ทั้งชุดล้ม
+            item["error"] = str(e)
+    return item
+
+
+def _batch_rows(items):
+    rows = []
+    for item in items:
+        r = item["result"]
+        if item["error"]:
+            status = "❌ " + item["error"]
+        elif item["rejected"] is not None:
+            status = "⛔ " + item["rejected"].message
+        else:
+            status = {None: "", True: "บันทึกแล้ว", False: "เคยบันทึกแล้ว"}[item["logged"]]
+        rows.append({
+            "ไฟล์": item["name"],
+            "Peak Frequency (Hz)": round(r.peak_freq, 2) if r else None,
+            "Peak Amplitude": round(r.peak_amp, 2) if r else None,
+            "Result": r.result if r else "",
+            "สถานะ": status,
+        })
+    return rows
+
+
+# หลายไฟล์: วิเคราะห์พร้อมกันเบื้องหลัง แสดงความคืบหน้าทีละไฟล์ แล้วบันทึกผลทั้งชุดครั้งเดียว
+def batch_section(files, store, profile, method):
+    from concurrent.futures import as_completed
+
+    key = f"{profile.key}_batch"
+    ids = tuple(f.file_id for f in files)
+    saved = st.session_state.get(key)
+    if not (saved and saved["ids"] == ids and saved["method"] == method):
+        cache, executor = get_analysis_cache(), get_executor()
+        futures = [executor.submit(_analyze_upload, f, profile, method, cache) for f in files]
+        progress = st.progress(0.0, text=f"กำลังวิเคราะห์ {len(files)} ไฟล์...")
+        table = st.empty()
+        done = []
+        for n, future in enumerate(as_completed(futures), 1):
+            done.append(future.result())
+            progress.progress(n / len(files), text=f"วิเคราะห์แล้ว {n}/{len(files)} ไฟล์")
+            table.dataframe(_batch_rows(done), hide_index=True)
+        items = [f.result() for f in futures]  # เรียงตามลำดับที่อัปโหลด
+
+        ok = [item for item in items if item["result"] is not None]
+        with inspection(profile.key, source="batch", files=len(ok)):
+            inserted = store.append_many(
+                [(profile.key, i["result"].peak_freq, i["result"].peak_amp, i["result"].result, None, i["digest"]) for i in ok]
+            )
+            for item in items:
+                if item["rejected"] is not None:
+                    item["logged"] = store.log_rejection(profile.key, item["rejected"], source="batch", audio_hash=item["digest"])
+        for item, logged in zip(ok, inserted):
+            item["logged"] = logged
+        saved = st.session_state[key] = {"ids": ids, "method": method, "items": items}
+        if any(inserted):
+            invalidate_history()
+            st.rerun()
+        progress.empty()
+        table.empty()
+
+    items = saved["items"]
+    results = [i["result"].result for i in items if i["result"] is not None]
+    counts = ", ".join(f"{v}: {results.count(v)}" for v in dict.fromkeys(results))
+    rejected = sum(1 for i in items if i["rejected"] is not None)
+    if rejected:
+        counts += f", ไม่ผ่านการตรวจคุณภาพ: {rejected}"
+    st.success(f"✅ วิเคราะห์ครบ {len(items)} ไฟล์ ({counts})")
+    streamed = sum(1 for i in items if i["used"] != method)
+    if streamed:
+        st.info(f"{streamed} ไฟล์: {STREAMED_NOTE}")
+    st.dataframe(_batch_rows(items), hide_index=True)
+
+    # ดูรายละเอียดและกราฟของไฟล์ใดไฟล์หนึ่ง
+    ok = [i for i in items if i["result"] is not None]
+    if ok:
+        names = [i["name"] for i in ok]
+        pick = st.selectbox("ดูกราฟของไฟล์", range(len(ok)), format_func=names.__getitem__, key=f"{profile.key}_batch_pick")
+        show_result(ok[pick]["result"], profile)
+
+
+# ตารางผลการทดสอบก่อนหน้า แบ่งหน้า ดึงจากฐานข้อมูลทีละหน้า
+@st.fragment
+def history_panel(store, profile):
+    import pandas as pd
+
+    from .engine import DEFECTIVE, GOOD, TOO_LOUD
+
+    c1, c2, c3 = st.columns([2, 1, 1])
+    dates = c1.date_input("ช่วงวันที่", value=(), key=f"{profile.key}_history_dates")
+    result = c2.selectbox("ผลการทดสอบ", [ALL_RESULTS, GOOD, DEFECTIVE, TOO_LOUD], key=f"{profile.key}_history_result")
+    page_size = c3.selectbox("แถวต่อหน้า", PAGE_SIZES, key=f"{profile.key}_history_size")
+
+    start = dates[0] if len(dates) > 0 else None
+    end = dates[1] if len(dates) > 1 else start
+    result = None if result == ALL_RESULTS else result
+
+    rejection_panel(store, profile, start, end)
+    total = cached_count(store, store.path, profile.key, start, end, result)
+    if not total:
+        st.info("ยังไม่มีข้อมูลการทดสอบ")
+        return
+
+    pages = (total + page_size - 1) // page_size
+    page = st.number_input(f"หน้า (จาก {pages})", min_value=1, max_value=pages, value=1, key=f"{profile.key}_history_page")
+    offset = (page - 1) * page_size
+
+    with inspection(profile.key, source="history"), timed("history"):
+        rows = store.query(profile.key, start, end, result, limit=page_size, offset=offset, newest_first=True)
+        df = pd.DataFrame(rows, columns=COLUMNS)
+    st.dataframe(df, hide_index=True)
+    st.caption(f"แสดง {offset + 1}–{offset + len(rows)} จาก {total} รายการ (ล่าสุดก่อน)")
+
+
+# เสียงที่ไม่ผ่านการตรวจคุณภาพในช่วงวันที่เดียวกับตารางผล (แสดงเมื่อมีเท่านั้น)
+def rejection_panel(store, profile, start, end, limit=100):
+    import pandas as pd
+
+    from .quality import REASON_LABELS
+    from .store import REJECTION_COLUMNS
+
+    counts = store.rejection_counts(profile.key, start, end)
+    if not counts:
+        return
+    summary = ", ".join(f"{REASON_LABELS.get(k, k)} {n}" for k, n in counts.items())
+    with st.expander(f"⛔ เสียงที่ไม่ผ่านการตรวจคุณภาพ {sum(counts.values())} ไฟล์ ({summary})"):
+        df = pd.DataFrame(store.rejections(profile.key, start, end, limit=limit), columns=REJECTION_COLUMNS)
+        df["Reason"] = df["Reason"].map(lambda k: REASON_LABELS.get(k, k))
+        st.dataframe(df, hide_index=True)
+
+
+# ดาวน์โหลดผลเป็น Excel/CSV (สร้างไฟล์ตอนกดปุ่มเท่านั้น กดแล้วไม่ rerun)
+@st.fragment
+def export_panel(store, profile):
+    from .export import FORMATS, export, file_name
+    from .profiles import PROFILES
+
+    keys = list(PROFILES)
+    c1, c2, c3 = st.columns([1, 2, 1])
+    material = c1.selectbox("วัสดุ", keys, index=keys.index(profile.key), format_func=lambda k: PROFILES[k].name, key=f"{profile.key}_export_material")
+    dates = c2.date_input("ช่วงวันที่", value=(), key=f"{profile.key}_export_dates")
+    fmt = c3.radio("รูปแบบไฟล์", list(FORMATS), horizontal=True, key=f"{profile.key}_export_format")
+
+    start = dates[0] if len(dates) > 0 else None
+    end = dates[1] if len(dates) > 1 else start
+    st.download_button(
+        f"Download {fmt.upper()}",
+        lambda: export(store, material, fmt, start=start, end=end),
+        file_name=file_name(material, fmt, start, end),
+        mime=FORMATS[fmt],
+        on_click="ignore",
+        key=f"{profile.key}_export_download",
+    )
+
+
+# 🔴 ปุ่มลบข้อมูล (ลบแล้ว rerun ทั้งหน้าเพื่อให้ตารางว่าง)
+@st.fragment
+def clear_panel(store, profile):
+    if st.button("❌ ลบข้อมูลทั้งหมด", key=f"{profile.key}_clear"):
+        store.clear(profile.key)
+        invalidate_history()
+        st.session_state[f"{profile.key}_cleared"] = True
+        st.rerun()
+
+
+# เวลาแต่ละขั้นตอน (ครั้งล่าสุด และ p50/p95/p99 ของ process นี้) แสดงใน sidebar เมื่อเปิดสวิตช์
+@st.fragment
+def diagnostics_panel(profile):
+    from .metrics import REGISTRY, STAGE_LABELS
+
+    if not st.toggle("🩺 แสดงเวลาแต่ละขั้นตอน", key=f"{profile.key}_diagnostics"):
+        return
+    st.button("🔄 อัปเดต", key=f"{profile.key}_diagnostics_refresh")
+
+    recent = [t for t in REGISTRY.traces(profile.key) if t.labels.get("source") not in ("plot", "history")]
+    if recent:
+        t = recent[-1]
+        st.caption(f"การตรวจล่าสุด ({t.labels.get('source', '')}) รวม {t.total * 1000:.1f} ms")
+        st.dataframe(
+            [{"ขั้นตอน": STAGE_LABELS.get(k, k), "ms": round(v[0] * 1000, 2), "KiB": round(v[1] / 1024)} for k, v in t.stages.items()],
+            hide_index=True,
+        )
+
+    rows = REGISTRY.summary(profile.key)
+    if not rows:
+        st.caption("ยังไม่มีข้อมูลการจับเวลา")
+        return
+    st.caption(f"สถิติย้อนหลัง (ล่าสุด {REGISTRY.window} ครั้งต่อขั้นตอน)")
+    st.dataframe(
+        [
+            {
+                "ขั้นตอน": STAGE_LABELS.get(r["stage"], r["stage"]),
+                "ครั้ง": r["count"],
+                "p50 ms": round(r["p50"] * 1000, 2),
+                "p95 ms": round(r["p95"] * 1000, 2),
+                "p99 ms": round(r["p99"] * 1000, 2),
+                "p50 KiB": round(r["bytes_p50"] / 1024),
+            }
+            for r in rows
+        ],
+        hide_index=True,
+    )
+
+
+# หน้าตรวจสอบของวัสดุหนึ่งชนิด
+def inspection_page(profile):
+    from .warmup import start_if_enabled
+
+    start_if_enabled()
+    store = get_store()
+    import_legacy_excel(store, store.path, profile.excel_file, profile.key)
+
+    analysis_section(store, profile)
+
+    # แสดงข้อมูลการทดสอบก่อนหน้า
+    st.markdown("---")
+    st.subheader("📊 ข้อมูลการทดสอบก่อนหน้า")
+    if st.session_state.pop(f"{profile.key}_cleared", False):
+        st.success("ลบข้อมูลเรียบร้อยแล้ว")
+
+    history_panel(store, profile)
+    if cached_count(store, store.path, profile.key, None, None, None):
+        with st.expander("📥 ดาวน์โหลดไฟล์ Excel / CSV"):
+            export_panel(store, profile)
+        with st.expander("🗑️ ล้างข้อมูลทั้งหมด"):
+            clear_panel(store, profile)
+
+    with st.sidebar:
+        diagnostics_panel(profile)
@@ -0,0 +1,114 @@
+# อุ่นเครื่องตอนเริ่ม server: import โมดูลหนักและรันการวิเคราะห์กับเสียงสังเคราะห์
+# ใน thread เบื้องหลัง ผู้ใช้คนแรกหลังรีสตาร์ตจึงไม่ต้องรอ
+#
+#   python -m inspection.warmup home.py [ตัวเลือกของ streamlit run]   # เริ่ม server พร้อมอุ่นเครื่อง
+#   python -m inspection.warmup --check                              # อุ่นเครื่องอย่างเดียว แล้วพิมพ์เวลา
+#
+# หรือตั้ง INSPECTION_WARMUP=1 ให้หน้าเว็บเริ่มอุ่นเครื่องตั้งแต่มีผู้เปิดหน้าแรก
+# วัสดุที่มีโฟลเดอร์ตัวอย่าง (reference_dir) สร้าง/อัปเดตดัชนีลักษณะเสียงไว้ให้หน้าเว็บอ่านด้วย
+import os
+import sys
+import threading
+import time
+from importlib import import_module
+
+MODULES = ["numpy", "soundfile", "pandas", "pyarrow", "openpyxl", "pytz", "PIL.Image"]
+SAMPLE_RATE = 48000
+SECONDS = 1.0
+
+_lock = threading.Lock()
+_thread = None
+timings = {}  # ขั้นตอน -> วินาที (อ่านได้หลังอุ่นเครื่องเสร็จ)
+
+
+def _timed(name, fn):
+    t0 = time.perf_counter()
+    try:
+        fn()
+    except Exception as e:  # อุ่นเครื่องไม่สำเร็จไม่ควรทำให้ server ล้ม
+        timings[name] = f"failed: {e}"
+    else:
+        timings[name] = time.perf_counter() - t0
+
+
+# เสียงเคาะสังเคราะห์ที่ความถี่กลางแถบของวัสดุ ผ่านทุกวิธีวิเคราะห์และการวาดกราฟ
+def _analyze_dummy(profile):
+    import numpy as np
+
+    from .plotting import spectrum_chart
+    from .quality import assess
+    from .resample import analyze_decimated
+    from .taps import analyze_taps
+    from .zoom import analyze_zoom
+
+    t = np.arange(int(SAMPLE_RATE * SECONDS)) / SAMPLE_RATE
+    f0 = (profile.freq_low + profile.freq_high) / 2
+    y = np.sin(2 * np.pi * f0 * t) * np.exp(-8 * (t % 0.5)) * 0.5
+    y = y.astype(np.float32)
+    assess((y * 32767).astype(np.int16))
+    for analyze in (analyze_decimated, analyze_zoom, analyze_taps):
+        r = analyze(y, SAMPLE_RATE, profile)
+    spectrum_chart(r.frequencies, r.magnitudes, r.peak_freq, profile)
+
+
+# ทำใน thread ของ server จึงถอดรหัสใน process เดียว (workers=1): fork จาก process ที่มีหลาย thread
+# อาจค้างที่ lock ที่ thread อื่นถืออยู่ และ worker แต่ละตัวจะคัดลอกหน่วยความจำของ server ทั้งก้อน
+def _build_index(root):
+    from .features import update_index
+
+    update_index(root, workers=1)
+
+
+def warm_up():
+    from .profiles import PROFILES
+
+    for name in MODULES:
+        _timed(f"import {name}", lambda: import_module(name))
+    for key, profile in PROFILES.items():
+        _timed(f"analyze {key}", lambda: _analyze_dummy(profile))
+    for root in sorted({p.reference_dir for p in PROFILES.values() if p.reference_dir}):
+        _timed(f"features {root}", lambda: _build_index(root))
+    return timings
+
+
+# เริ่มอุ่นเครื่องใน thread เบื้องหลัง (เรียกซ้ำได้ ทำครั้งเดียวต่อ process)
+def start():
+    global _thread
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=warm_up, name="inspection-warmup", daemon=True)
+            _thread.start()
+    return _thread
+
+
+def enabled():
+    return os.environ.get("INSPECTION_WARMUP", "0").lower() not in ("", "0", "false", "no")
+
+
+def start_if_enabled():
+    if enabled():
+        start()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv == ["--check"]:
+        t0 = time.perf_counter()
+        for name, seconds in warm_up().items():
+            print(f"{name:<24}{seconds if isinstance(seconds, str) else f'{seconds * 1000:9.1f} ms'}")
+        print(f"{'total':<24}{(time.perf_counter() - t0) * 1000:9.1f} ms")
+        return 0
+    if not argv:
+        print("usage: python -m inspection.warmup SCRIPT [streamlit run options] | --check", file=sys.stderr)
+        return 2
+
+    # server รันใน process เดียวกัน โมดูลที่ thread นี้โหลดไว้จึงใช้ต่อได้ทันที
+    start()
+    from streamlit.web import cli
+
+    sys.argv = ["streamlit", "run", *argv]
+    return cli.main()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+# อ่าน WAV แบบ PCM โดยไม่คัดลอกข้อมูล: แยก header RIFF เอง แล้วมองข้อมูลเสียงเป็น array ของ numpy
+# ตรงจาก buffer ของไฟล์ที่อัปโหลด (bytes) หรือจากไฟล์บนดิสก์ผ่าน mmap
+#
+# คืนค่าเป็นชนิดเดิมของไฟล์ (int16 / int32 / float32 / float64) ของ channel ที่เลือก (strided view)
+# ไม่ได้แปลงเป็น float ในช่วง [-1, 1] เหมือน sf.read: ขั้นแรกของการวิเคราะห์ (normalize, decimate)
+# แปลงชนิดและหารด้วยค่าสูงสุดอยู่แล้ว จึงเลือก channel + แปลงชนิดในรอบเดียวกันนั้น
+# PCM 24 บิตคัดลอกเฉพาะ channel ที่เลือกเป็น int32 (ค่า << 8) ไฟล์รูปแบบอื่นคืน None ให้ใช้ soundfile แทน
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+
+import numpy as np
+
+PCM = 1
+IEEE_FLOAT = 3
+EXTENSIBLE = 0xFFFE
+# GUID ของ WAVE_FORMAT_EXTENSIBLE: 2 ไบต์แรกคือรหัสรูปแบบ ที่เหลือคงที่
+_GUID_TAIL = b"\x00\x00\x00\x00\x10\x00\x80\x00\x00\xaa\x00\x38\x9b\x71"
+
+_DTYPES = {
+    (PCM, 16): np.dtype("<i2"),
+    (PCM, 24): None,  # ไม่มีชนิด 3 ไบต์ใน numpy
+    (PCM, 32): np.dtype("<i4"),
+    (IEEE_FLOAT, 32): np.dtype("<f4"),
+    (IEEE_FLOAT, 64): np.dtype("<f8"),
+}
+
+
+@dataclass(frozen=True)
+class WavInfo:
+    format: int  # PCM หรือ IEEE_FLOAT
+    channels: int
+    samplerate: int
+    bits: int
+    offset: int  # ตำแหน่งเริ่มข้อมูลเสียงใน buffer
+    frames: int
+
+    @property
+    def block_align(self):
+        return self.channels * self.bits // 8
+
+
+# แยก chunk ของ RIFF/WAVE คืน None ถ้าไม่ใช่ PCM/float ธรรมดาที่อ่านเองได้
+def parse_header(buf):
+    n = len(buf)
+    if n < 12 or buf[0:4] != b"RIFF" or buf[8:12] != b"WAVE":
+        return None
+    fmt = None
+    pos = 12
+    while pos + 8 <= n:
+        chunk_id = bytes(buf[pos : pos + 4])
+        (size,) = struct.unpack_from("<I", buf, pos + 4)
+        body = pos + 8
+        if chunk_id == b"fmt ":
+            if size < 16 or body + size > n:
+                return None
+            tag, channels, samplerate, _, block_align, bits = struct.unpack_from("<HHIIHH", buf, body)
+            if tag == EXTENSIBLE:
+                if size < 40 or bytes(buf[body + 26 : body + 40]) != _GUID_TAIL:
+                    return None
+                (tag,) = struct.unpack_from("<H", buf, body + 24)
+            fmt = (tag, channels, samplerate, bits, block_align)
+        elif chunk_id == b"data":
+            if fmt is None:
+                return None
+            tag, channels, samplerate, bits, block_align = fmt
+            if (tag, bits) not in _DTYPES or not channels or block_align != channels * bits // 8:
+                return None
+            # เครื่องบันทึกที่ยังเขียนไม่จบอาจใส่ขนาดเป็น 0 หรือ 0xFFFFFFFF: ใช้เท่าที่มีจริง
+            available = n - body
+            if size == 0 or size > available:
+                size = available
+            return WavInfo(tag, channels, samplerate, bits, body, size // block_align)
+        pos = body + size + (size & 1)  # chunk ขนาดคี่มีไบต์เติม
+    return None
+
+
+def _samples(buf, info, channel):
+    if info.bits == 24:
+        raw = np.frombuffer(buf, np.uint8, info.frames * info.block_align, info.offset)
+        raw = raw.reshape(info.frames, info.channels, 3)[:, channel]
+        out = np.zeros((info.frames, 4), np.uint8)
+        out[:, 1:] = raw  # ไบต์ล่างเป็นศูนย์: ได้ค่า int32 = ตัวอย่าง << 8 เครื่องหมายถูกต้อง
+        return out.view("<i4")[:, 0]
+    frames = np.frombuffer(buf, _DTYPES[info.format, info.bits], info.frames * info.channels, info.offset)
+    return frames.reshape(info.frames, info.channels)[:, channel]
+
+
+# source: bytes / bytearray / memoryview, io.BytesIO หรือ path ของไฟล์
+# คืน (array ของ channel ที่เลือก, sample rate) หรือ None เมื่อต้องใช้ soundfile
+def read(source, channel=0):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        buf = source
+    elif hasattr(source, "getbuffer"):
+        buf = source.getbuffer()
+    elif isinstance(source, (str, os.PathLike)):
+        try:
+            with open(source, "rb") as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # ไฟล์ว่าง/map ไม่ได้ ให้ soundfile รายงานข้อผิดพลาด
+            return None
+    else:
+        return None
+    info = parse_header(buf)
+    if info is None or not info.frames or not 0 <= channel < info.channels:
+        return None
+    return _samples(buf, info, channel), info.samplerate
+
+
+# ค่าเต็มสเกลของชนิดข้อมูลที่ได้จาก read() (float = 1.0)
+def full_scale(y):
+    if np.issubdtype(y.dtype, np.integer):
+        return float(2 ** (8 * y.dtype.itemsize - 1))
+    return 1.0
@@ -0,0 +1,126 @@
+# วิเคราะห์ความละเอียดสูงเฉพาะช่วงความถี่รอบแถบที่ยอมรับ (zoom FFT)
+#
+# เลื่อนแถบลงมาที่ 0 Hz (heterodyne) -> กรองผ่านต่ำ + ลด sample rate แบบ polyphase
+# -> FFT เติมศูนย์ของสัญญาณสั้นๆ ที่เหลือ -> หายอดด้วยการประมาณค่าระหว่าง bin
+# ทายจากขอบบน (โดยประมาณ) ของสเปกตรัมในและนอกแถบจากเฟรมสั้นก่อน (engine.BandBound ถูกกว่า FFT ทั้งไฟล์)
+# ถ้านอกแถบอาจสูงกว่าในแถบ ยอดสูงสุดต้องมาจาก FFT ทั้งไฟล์อยู่แล้ว จึงข้ามขั้น zoom ไปเลย
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from .engine import BandBound, classify, first_channel, hamming_window, peak_abs, pick_peak, spectrum
+from .metrics import timed
+from .resample import fir_decimate
+
+RESOLUTION = 0.1  # Hz ต่อ bin ของ zoom spectrum (ก่อนประมาณค่าระหว่าง bin)
+MARGIN = 1.0  # ขยายช่วงวิเคราะห์ออกข้างละกี่เท่าของความกว้างแถบ
+ZOOM_PHASES = 8  # ความยาว filter = ZOOM_PHASES * อัตราลด
+PHASOR_CHUNK = 1 << 16  # complex64 512 KB ต่อ (sr, fc) ไม่ว่าไฟล์ยาวเท่าใด
+
+
+@dataclass
+class ZoomResult:
+    peak_freq: float
+    peak_amp: float
+    result: str
+    frequencies: np.ndarray
+    magnitudes: np.ndarray
+    global_peak_freq: float
+    full_band_fallback: bool  # True เมื่อขอบบนไม่พอยืนยัน ต้องคำนวณ FFT ทั้งย่าน
+
+
+def analysis_band(profile, margin=MARGIN):
+    width = profile.freq_high - profile.freq_low
+    return max(profile.freq_low - margin * width, 0.0), profile.freq_high + margin * width
+
+
+# exp(-j 2pi fc t) ของหนึ่งช่วง cache ไว้ตาม (sr, fc) ช่วงถัดไปคือตารางเดิมคูณด้วยเฟสเริ่มของช่วงนั้น
+@lru_cache(maxsize=8)
+def _phasor_table(sr, fc):
+    p = np.exp(-2j * np.pi * fc / sr * np.arange(PHASOR_CHUNK)).astype(np.complex64)
+    p.flags.writeable = False
+    return p
+
+
+# y * exp(-j 2pi fc t) ทีละช่วง (หน่วยความจำของ cache ไม่โตตามความยาวไฟล์ที่อัปโหลด)
+def heterodyne(y, sr, fc):
+    table = _phasor_table(sr, fc)
+    z = np.empty(len(y), dtype=np.complex64)
+    for start in range(0, len(y), PHASOR_CHUNK):
+        stop = min(start + PHASOR_CHUNK, len(y))
+        np.multiply(y[start:stop], table[: stop - start], out=z[start:stop])
+        z[start:stop] *= np.complex64(np.exp(-2j * np.pi * fc / sr * start))
+    return z
+
+
+def _interpolate(magnitudes, i):
+    # ประมาณยอดระหว่าง bin ด้วยพาราโบลาบน log magnitude
+    if 0 < i < len(magnitudes) - 1:
+        a, b, c = np.log(magnitudes[i - 1 : i + 2] + 1e-300)
+        denom = a - 2 * b + c
+        if denom < 0:
+            d = 0.5 * (a - c) / denom
+            return d, float(np.exp(b - 0.25 * (a - c) * d))
+    return 0.0, float(magnitudes[i])
+
+
+def analyze_zoom(y, sr, profile, resolution=RESOLUTION, margin=MARGIN):
+    y = first_channel(y)
+    lo, hi = analysis_band(profile, margin)
+    fc = (lo + hi) / 2
+    half = (hi - lo) / 2
+
+    scale = 1 / (peak_abs(y) or 1.0)
+    bound = BandBound(y, sr, lo, hi)
+    with timed("fft"):
+        predicted = bound.likely_outside()
+    full = None
+    if predicted:
+        # นอกแถบอาจสูงกว่ายอดในแถบ: ต้องใช้ FFT ทั้งไฟล์อยู่แล้ว ถ้ายอดสูงสุดอยู่นอกแถบจริงก็ไม่ต้อง zoom
+        full = spectrum(y, sr)
+        global_freq, global_amp = pick_peak(*full)
+        if not lo <= global_freq <= hi:
+            return ZoomResult(global_freq, global_amp, classify(global_freq, global_amp, profile), *full, global_freq, True)
+
+    # อัตราลดให้แถบกินไม่เกินราว 1/4 ของ sample rate ใหม่ (เผื่อช่วง transition ของ filter)
+    factor = max(int(sr / (8 * half)), 1)
+    with timed("window") as span:
+        z = heterodyne(y, sr, fc)
+        zd = fir_decimate(z, factor, ZOOM_PHASES)
+        # window เปลี่ยนช้ามากเทียบกับแถบ จึงคูณหลังลด sample rate ได้ (สั้นกว่ามาก)
+        zd *= hamming_window(len(zd), np.dtype(np.float32))
+        span.add(z, zd)
+
+    sr_d = sr / factor
+    nfft = max(1 << int(np.ceil(np.log2(sr_d / resolution))), len(zd))
+    with timed("fft") as span:
+        Z = np.fft.fftshift(np.fft.fft(zd, nfft))
+        offsets = np.fft.fftshift(np.fft.fftfreq(nfft, d=1 / sr_d))
+        keep = (offsets >= -half) & (offsets <= half)
+        frequencies = fc + offsets[keep]
+        # Normalize ตอนท้าย (สเปกตรัมเป็นเชิงเส้น) และคูณอัตราลดให้สเกลเท่ากับ FFT ทั้งไฟล์
+        magnitudes = np.abs(Z[keep]) * (factor * scale)
+        span.add(Z, frequencies, magnitudes)
+
+    with timed("peak"):
+        i = int(np.argmax(magnitudes))
+        d, peak_amp = _interpolate(magnitudes, i)
+        peak_freq = float(frequencies[i] + d * sr_d / nfft)
+
+    # ตรวจทั้งย่านแบบถูก: ถ้าขอบบนนอกช่วงต่ำกว่ายอดในช่วง ถือว่ายอดนี้คือยอดสูงสุดจริง
+    # ไม่เช่นนั้นคำนวณ FFT ทั้งไฟล์ ขอบบนเผื่อ scalloping ไว้ด้วย BOUND_MARGIN แต่ไม่ใช่ขอบบนเคร่งครัด
+    # (ดู engine.BandBound) ยอดนอกแถบที่สูงกว่ายอดในแถบไม่ถึงส่วนเผื่อนั้นอาจไม่ถูกตรวจพบ
+    if full is None:
+        with timed("fft"):
+            outside = bound.bounds()[1]
+        if outside * scale >= peak_amp:
+            full = spectrum(y, sr)
+            global_freq, global_amp = pick_peak(*full)
+            if not lo <= global_freq <= hi:
+                peak_freq, peak_amp = global_freq, global_amp
+    fallback = full is not None
+    if not fallback:
+        global_freq = peak_freq
+
+    return ZoomResult(peak_freq, peak_amp, classify(peak_freq, peak_amp, profile), frequencies, magnitudes, global_freq, fallback)
@@ -1,26 +1,18 @@
 import streamlit as st
-from PIL import Image
-from io import BytesIO
-import base64
+
+from inspection.assets import data_uri
 
 st.set_page_config(page_title="Acoustic Inspection Guide", page_icon="📘", layout="wide")
 
-# ==== Helper ====
-def image_to_base64(image_path):
-    img = Image.open(image_path)
-    buffered = BytesIO()
-    img.save(buffered, format="PNG")
-    return base64.b64encode(buffered.getvalue()).decode()
-
-# ==== Load Images as Base64 ====
-logo1_b64 = image_to_base64("images/logo1.png")
-logo2_b64 = image_to_base64("images/logo2.png")
-sm57_b64 = image_to_base64("images/SM57.png")
-bmg11s_b64 = image_to_base64("images/interface.png")
+# ==== Load Images as data URI (แปลงครั้งเดียวต่อ process ย่อตามขนาดที่แสดง) ====
+logo1_uri = data_uri("images/logo1.png", height=120)
+logo2_uri = data_uri("images/logo2.png", height=120)
+sm57_uri = data_uri("images/SM57.png", width=400)
+bmg11s_uri = data_uri("images/interface.png", width=400)
 #ภาพที่ใช้ในคู่มือ
-Home_b64 = image_to_base64("images/Home.png")
-pick_b64 = image_to_base64("images/pick.png")
-sum_b64 = image_to_base64("images/sum.png")
+Home_uri = data_uri("images/Home.png", width=400)
+pick_uri = data_uri("images/pick.png", width=400)
+sum_uri = data_uri("images/sum.png", width=400)
 
 # ==== Custom CSS ====
 st.markdown("""
@@ -124,8 +116,8 @@ div[data-testid="stExpander"] span {
 # ==== Header ====
 st.markdown(f"""
 <div class="logo-bar">
-    <img src="data:image/png;base64,{logo1_b64}" alt="logo1">
-    <img src="data:image/png;base64,{logo2_b64}" alt="logo2">
+    <img src="{logo1_uri}" alt="logo1">
+    <img src="{logo2_uri}" alt="logo2">
 </div>
 """, unsafe_allow_html=True)
 
@@ -152,7 +144,7 @@ with st.expander("🎤 อุปกรณ์ที่ใช้ในการต
 - ความถี่ตอบสนอง: 40Hz – 15kHz
 - รองรับระดับเสียงสูงสุด (SPL) ถึง 150dB
     """)
-    st.markdown(f'<img src="data:image/png;base64,{sm57_b64}" width="400">', unsafe_allow_html=True)
+    st.markdown(f'<img src="{sm57_uri}" width="400">', unsafe_allow_html=True)
 
     st.markdown("""
 #### 🔈 อินเทอร์เฟซเสียง: Bomge BMG-11S
@@ -160,7 +152,7 @@ with st.expander("🎤 อุปกรณ์ที่ใช้ในการต
 - มีพอร์ต XLR พร้อม Phantom Power 48V สำหรับไมโครโฟนคอนเดนเซอร์
 - เหมาะสำหรับการบันทึกเสียงในสตูดิโอและการสตรีมมิง
     """)
-    st.markdown(f'<img src="data:image/png;base64,{bmg11s_b64}" width="400">', unsafe_allow_html=True)
+    st.markdown(f'<img src="{bmg11s_uri}" width="400">', unsafe_allow_html=True)
 
     st.markdown("""
 #### 🧱 วัสดุที่ใช้ทดสอบ
@@ -195,14 +187,14 @@ with st.expander("📘 คู่มือการใช้งานแอปต
 - ไปที่หน้าเมนูหลักของแอป
 - เลือกฟังก์ชั่นที่ต้องการใช้งานเช่น Steel
 """)
-    st.markdown(f'<img src="data:image/png;base64,{Home_b64}" width="400">', unsafe_allow_html=True) #รูปหน้าเว็บ
+    st.markdown(f'<img src="{Home_uri}" width="400">', unsafe_allow_html=True) #รูปหน้าเว็บ
     
     st.markdown("""
 #### 🔹 ขั้นตอนที่ 2: อัปโหลดเสียงที่ต้องการทดสอบ
 - เลือกเมนู **Upload Reference** เพื่ออัปโหลดเสียงทดสอบ
 - อัปโหลดไฟล์ `.wav` ที่เป็นเสียงของวัสดุที่ดี
 """)
-    st.markdown(f'<img src="data:image/png;base64,{pick_b64}" width="400">', unsafe_allow_html=True) #กดbrowser
+    st.markdown(f'<img src="{pick_uri}" width="400">', unsafe_allow_html=True) #กดbrowser
     
     st.markdown("""
 #### 🔹 ขั้นตอนที่ 3: ตรวจสอบเสียง
@@ -211,7 +203,7 @@ with st.expander("📘 คู่มือการใช้งานแอปต
   - ✅ **Good**: เสียงมีความคล้ายกับเสียงอ้างอิง
   - ❌ **Faulty**: มีความแตกต่างอย่างชัดเจน
 """)
-    st.markdown(f'<img src="data:image/png;base64,{sum_b64}" width="400">', unsafe_allow_html=True) #กดbrowser
+    st.markdown(f'<img src="{sum_uri}" width="400">', unsafe_allow_html=True) #กดbrowser
 
 st.markdown("""
 #### 📝 หมายเหตุสำคัญ
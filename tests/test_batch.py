@@ -0,0 +1,35 @@
+import numpy as np
+import soundfile as sf
+
+from inspection.batch import run_corpus
+from inspection.corpus import _index_path, open_corpus, pack
+from inspection.engine import GOOD
+
+SAMPLE_RATE = 48000
+
+
+def tap(freq, seconds=1.0, sr=SAMPLE_RATE):
+    t = np.arange(int(seconds * sr)) / sr
+    rng = np.random.default_rng(0)
+    return 0.5 * np.sin(2 * np.pi * freq * t) * np.exp(-8 * (t % 0.5)) + 1e-3 * rng.standard_normal(len(t))
+
+
+def test_bad_archive_entry_records_error_row(tmp_path):
+    root = tmp_path / "recordings"
+    (root / "Good_wav").mkdir(parents=True)
+    for name in ("a.wav", "b.wav", "c.wav"):
+        sf.write(root / "Good_wav" / name, tap(8700), SAMPLE_RATE, subtype="PCM_16")
+    corpus, _ = pack(str(root))
+
+    # ทำให้รายการกลางเสีย (sample rate 0) ใน index ที่ manifest ชี้อยู่
+    path = _index_path(corpus.directory, corpus.generation, corpus.revision)
+    index = np.load(path)
+    index["sample_rate"][1] = 0
+    np.save(path, index)
+    assert open_corpus(corpus.directory).index["sample_rate"][1] == 0
+
+    rows = run_corpus(corpus.directory, "steel", workers=1)
+    assert [r["File"] for r in rows] == corpus.paths
+    assert rows[1]["Error"] and rows[1]["Result"] == ""
+    assert rows[1]["Expected"] == GOOD
+    assert all(r["Result"] and not r["Error"] for r in rows[::2])
@@ -0,0 +1,44 @@
+import io
+
+import numpy as np
+import soundfile as sf
+
+from inspection import methods
+from inspection.profiles import STEEL
+from inspection.server import InspectionService
+from inspection.store import ResultStore
+from inspection.streaming import analyze_stream
+
+SAMPLE_RATE = 48000
+
+
+def tap_wav(freq=8700, seconds=1.5, sr=SAMPLE_RATE):
+    t = np.arange(int(seconds * sr)) / sr
+    y = 0.5 * np.sin(2 * np.pi * freq * t) * np.exp(-40 * (t % 0.5))
+    y += 1e-3 * np.random.default_rng(0).standard_normal(len(t))
+    buf = io.BytesIO()
+    sf.write(buf, y, sr, subtype="PCM_16", format="WAV")
+    return buf.getvalue()
+
+
+def test_large_file_reports_stream_method(monkeypatch):
+    data = tap_wav()
+    assert methods.used_method(len(data), "zoom") == "zoom"
+    monkeypatch.setattr(methods, "STREAMING_BYTES", len(data) - 1)
+    assert methods.used_method(len(data), "zoom") == "stream"
+
+    r = methods.analyze_audio(data, len(data), STEEL, "zoom")
+    expected = analyze_stream(io.BytesIO(data), STEEL)
+    assert (r.peak_freq, r.peak_amp, r.result) == (expected.peak_freq, expected.peak_amp, expected.result)
+
+
+def test_http_body_reports_method_used(monkeypatch, tmp_path):
+    data = tap_wav()
+    service = InspectionService(ResultStore(str(tmp_path / "results.db")), workers=1, queue_size=1)
+    try:
+        assert service.inspect(data, "steel", "taps")["method"] == "taps"
+        monkeypatch.setattr(methods, "STREAMING_BYTES", len(data) - 1)
+        body = service.inspect(data, "steel", "zoom")
+        assert (body["method"], body["requested_method"]) == ("stream", "zoom")
+    finally:
+        service.shutdown()